@@ -0,0 +1,21 @@
+"""
+Сборка статики перед запуском приложения:
+    python -m assets
+"""
+from assets.build import STATIC_DIR, build
+
+
+def main() -> None:
+    for source, target in build().items():
+        original = (STATIC_DIR / source).stat().st_size
+        built = (STATIC_DIR / target).stat().st_size
+        sizes = [f"{original} -> {built}"] + [
+            f"{suffix} {(STATIC_DIR / (target + suffix)).stat().st_size}"
+            for suffix in (".gz", ".br")
+            if (STATIC_DIR / (target + suffix)).exists()
+        ]
+        print(f"{source} -> {target} ({', '.join(sizes)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Сборка статики: минификация CSS/JS, имена файлов с хэшем содержимого,
+manifest.json для шаблонов и сжатые копии .gz/.br рядом с файлами.
+"""
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import brotli
+import rcssmin
+import rjsmin
+
+from config.settings import BASE_DIR
+
+
+STATIC_DIR = BASE_DIR / "web" / "static"
+BUILD_NAME = "build"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_PATH = STATIC_DIR / BUILD_NAME / MANIFEST_NAME
+
+# img/avatars - загрузки пользователей, их пути хранятся в базе
+SOURCES = ("css", "js", "img")
+EXCLUDE = ("img/avatars",)
+
+MINIFIERS = {
+    ".css": rcssmin.cssmin,
+    ".js": rjsmin.jsmin,
+}
+COMPRESSIBLE = {".css", ".js", ".svg", ".html", ".json", ".txt"}
+
+
+def hashed_name(path: str, content: bytes) -> str:
+    """css/main.css -> build/css/main.<хэш>.css"""
+    stem, suffix = os.path.splitext(path)
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    return f"{BUILD_NAME}/{stem}.{digest}{suffix}"
+
+
+def compressed_variants(content: bytes) -> dict[str, bytes]:
+    """Сжатые копии, которые меньше оригинала. mtime=0 - одинаковый .gz при пересборке"""
+    variants = {
+        ".gz": gzip.compress(content, compresslevel=9, mtime=0),
+        ".br": brotli.compress(content, quality=11),
+    }
+    return {suffix: data for suffix, data in variants.items() if len(data) < len(content)}
+
+
+def write_atomic(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+
+def source_files(static_dir: Path = STATIC_DIR):
+    for source in SOURCES:
+        for path in sorted((static_dir / source).rglob("*")):
+            relative = path.relative_to(static_dir).as_posix()
+            if path.is_file() and not relative.startswith(EXCLUDE):
+                yield relative, path
+
+
+def build(static_dir: Path = STATIC_DIR) -> dict[str, str]:
+    """Собирает статику и пишет манифест {исходный путь: путь собранного файла}.
+
+    Файлы прошлых сборок не удаляются: их имена уникальны, а страницы,
+    закэшированные до выкладки, ещё могут на них ссылаться.
+    """
+    manifest = {}
+    for relative, path in source_files(static_dir):
+        content = path.read_bytes()
+        if minify := MINIFIERS.get(path.suffix):
+            content = minify(content.decode()).encode()
+
+        target = hashed_name(relative, content)
+        manifest[relative] = target
+        if (static_dir / target).exists():
+            continue
+
+        write_atomic(static_dir / target, content)
+        if path.suffix in COMPRESSIBLE:
+            for suffix, data in compressed_variants(content).items():
+                write_atomic(static_dir / (target + suffix), data)
+
+    write_atomic(static_dir / BUILD_NAME / MANIFEST_NAME, json.dumps(manifest, indent=2).encode())
+    return manifest
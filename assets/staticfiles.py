@@ -0,0 +1,108 @@
+import json
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+import anyio
+from jinja2 import pass_context
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from assets.build import BUILD_NAME, MANIFEST_NAME, MANIFEST_PATH
+
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Порядок - предпочтение, если клиент принимает оба
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict[str, str]:
+    """Манифест сборки; без сборки (python -m assets) шаблоны ссылаются на исходники"""
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+manifest = load_manifest()
+
+
+def static_url_for(url_for):
+    """url_for шаблонов, который подставляет в static путь собранного файла"""
+
+    @pass_context
+    def wrapper(context, name: str, /, **path_params):
+        if name == "static" and "path" in path_params:
+            path_params["path"] = manifest.get(path_params["path"], path_params["path"])
+        return url_for(context, name, **path_params)
+
+    return wrapper
+
+
+def accepted_encodings(headers: Headers) -> set[str]:
+    encodings = set()
+    for item in headers.get("accept-encoding", "").split(","):
+        encoding, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        encodings.add(encoding.strip().lower())
+    return encodings
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles, который для собранных файлов отдаёт готовые .br/.gz
+    и разрешает кэшировать их навсегда: при изменении меняется имя.
+
+    immutable - шаблоны других путей, где имя файла - хэш содержимого
+    """
+
+    def __init__(self, *args, immutable: tuple[re.Pattern, ...] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable = immutable
+
+    def is_hashed(self, path: str) -> bool:
+        path = path.replace(os.sep, "/")
+        return path.startswith(f"{BUILD_NAME}/") and path != f"{BUILD_NAME}/{MANIFEST_NAME}"
+
+    def is_immutable(self, path: str) -> bool:
+        return self.is_hashed(path) or any(
+            pattern.fullmatch(path.replace(os.sep, "/")) for pattern in self.immutable
+        )
+
+    async def precompressed_response(self, path: str, accepted: set[str]) -> Response | None:
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is None:
+                continue
+
+            return FileResponse(
+                full_path,
+                stat_result=stat_result,
+                media_type=mimetypes.guess_type(path)[0],
+                headers={"Content-Encoding": encoding},
+            )
+        return None
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if not self.is_immutable(path) or scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        response = None
+        if self.is_hashed(path):
+            response = await self.precompressed_response(path, accepted_encodings(request_headers))
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        response.headers["Cache-Control"] = IMMUTABLE
+        if self.is_hashed(path):
+            response.headers["Vary"] = "Accept-Encoding"
+        if response.status_code == 200 and self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
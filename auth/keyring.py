@@ -0,0 +1,107 @@
+"""
+Кольцо ключей JWT: несколько ключей с kid, подпись активным ключом,
+проверка ключом из заголовка токена.
+
+Генерация новой пары ключей в certs/:
+    python -m auth.keyring <kid> [RS256|ES256|EdDSA]
+"""
+import sys
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jwt import InvalidTokenError
+
+from config.settings import settings, AuthJwt, JwtKey, BASE_DIR
+
+
+# Какой тип ключа допустим для алгоритма: иначе можно подписать не тем ключом
+KEY_TYPES = {
+    "RS256": (rsa.RSAPrivateKey, rsa.RSAPublicKey),
+    "ES256": (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey),
+    "EdDSA": (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey),
+}
+
+
+class SigningKey:
+    def __init__(self, kid: str, algorithm: str, public_key, private_key=None):
+        private_type, public_type = KEY_TYPES[algorithm]
+        if not isinstance(public_key, public_type) or \
+                (private_key is not None and not isinstance(private_key, private_type)):
+            raise ValueError(f"Key {kid!r} does not match algorithm {algorithm}")
+        if algorithm == "ES256" and public_key.curve.name != "secp256r1":
+            raise ValueError(f"Key {kid!r}: ES256 requires a P-256 key")
+
+        self.kid = kid
+        self.algorithm = algorithm
+        self.public_key = public_key
+        self.private_key = private_key
+
+    @classmethod
+    def load(cls, key: JwtKey) -> "SigningKey":
+        private_key = None
+        if key.private_key_path:
+            private_key = serialization.load_pem_private_key(key.private_key_path.read_bytes(), password=None)
+        public_key = serialization.load_pem_public_key(key.public_key_path.read_bytes())
+        return cls(key.kid, key.algorithm, public_key, private_key)
+
+    @classmethod
+    def generate(cls, kid: str, algorithm: str) -> "SigningKey":
+        if algorithm == "RS256":
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        elif algorithm == "ES256":
+            private_key = ec.generate_private_key(ec.SECP256R1())
+        else:
+            private_key = ed25519.Ed25519PrivateKey.generate()
+        return cls(kid, algorithm, private_key.public_key(), private_key)
+
+
+class KeyRing:
+    def __init__(self, keys: list[SigningKey], active_kid: str, legacy_kid: str | None = None):
+        self.keys = {key.kid: key for key in keys}
+        self.legacy_kid = legacy_kid
+
+        if active_kid not in self.keys or self.keys[active_kid].private_key is None:
+            raise ValueError(f"Active key {active_kid!r} must be in the ring and have a private key")
+        self.active = self.keys[active_kid]
+
+    def get(self, kid: str | None) -> SigningKey:
+        kid = kid or self.legacy_kid
+        if kid not in self.keys:
+            raise InvalidTokenError(f"Unknown key id {kid!r}")
+        return self.keys[kid]
+
+    @classmethod
+    def from_settings(cls, auth_jwt: AuthJwt = settings.auth_jwt) -> "KeyRing":
+        keys = auth_jwt.keys or [
+            JwtKey(
+                kid=auth_jwt.legacy_kid,
+                algorithm=auth_jwt.algorithm, # type: ignore
+                private_key_path=auth_jwt.private_key_path,
+                public_key_path=auth_jwt.public_key_path
+            )
+        ]
+        return cls([SigningKey.load(key) for key in keys], auth_jwt.active_kid, auth_jwt.legacy_kid)
+
+
+def write_key_pair(key: SigningKey, directory: Path = BASE_DIR / "certs") -> tuple[Path, Path]:
+    private_path = directory / f"jwt-{key.kid}-private.pem"
+    public_path = directory / f"jwt-{key.kid}-public.pem"
+
+    private_path.write_bytes(key.private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ))
+    public_path.write_bytes(key.public_key.public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ))
+    return private_path, public_path
+
+
+if __name__ == "__main__":
+    kid = sys.argv[1]
+    algorithm = sys.argv[2] if len(sys.argv) > 2 else "EdDSA"
+    for path in write_key_pair(SigningKey.generate(kid, algorithm)):
+        print(path)
@@ -0,0 +1,44 @@
+import time
+
+from config.settings import settings
+from schemas.users import Principal
+from utils.ttl_cache import TTLCache
+
+
+class PrincipalCache(TTLCache):
+    """LRU-кэш Principal по sub токена с TTL не дольше exp токена.
+
+    Инвалидация увеличивает generation: загрузка, начатая до инвалидации,
+    не сможет положить в кэш устаревшие данные.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: int):
+        super().__init__(maxsize)
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+
+    def put(self, sub: str, principal: Principal, exp: float | None, generation: int) -> None: # type: ignore[override]
+        expires_at = time.time() + self.ttl_seconds
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._put(sub, principal, expires_at)
+
+    def invalidate(self, user_id: int | str) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.auth_jwt.principal_cache_size,
+    ttl_seconds=settings.auth_jwt.principal_cache_ttl_seconds
+)
@@ -1,39 +1,64 @@
+import hashlib
 import jwt
 from config.settings import settings
 from datetime import datetime, timedelta, timezone
 
+from auth.keyring import KeyRing, SigningKey
+from utils.ttl_cache import TTLCache
+
+
+# Ключи разбираются один раз при импорте, а не в каждом jwt.encode/decode
+keyring = KeyRing.from_settings()
+
+# sha256(токен) -> payload уже проверенных токенов, живут до своего exp
+verified_tokens = TTLCache(maxsize=settings.auth_jwt.verified_token_cache_size)
+
+
 def encode_jwt(payload: dict,
-            private_key: str = settings.auth_jwt.private_key_path.read_text(),
-            algorithm: str = settings.auth_jwt.algorithm,
+            key: SigningKey | None = None,
             expire_minutes: int = settings.auth_jwt.access_token_expire_minutes,
             expire_timedelta: timedelta | None = None
             ) -> str:
+    key = key or keyring.active
     to_encode = payload.copy()
     now = datetime.now(timezone.utc)
-    
+
     if expire_timedelta:
         expire = now + expire_timedelta
     else:
         expire = now + timedelta(minutes=expire_minutes)
-        
+
     to_encode.update(
         exp=expire,
         iat=now
     )
-    
-    encoded = jwt.encode(to_encode, private_key, algorithm)
+
+    encoded = jwt.encode(to_encode, key.private_key, key.algorithm, headers={"kid": key.kid})
     return encoded
 
 def decode_jwt(
     token: str | bytes,
-    public_key: str = settings.auth_jwt.public_key_path.read_text(),
-    algorithm: str = settings.auth_jwt.algorithm,
+    ring: KeyRing | None = None,
 ) -> dict:
+    # Кэшируем только проверку основным кольцом ключей
+    use_cache = ring is None
+    ring = ring or keyring
+
+    if use_cache:
+        token_bytes = token.encode() if isinstance(token, str) else token
+        digest = hashlib.sha256(token_bytes).digest()
+        if (payload := verified_tokens.get(digest)) is not None:
+            return payload.copy()
+
+    # Алгоритм берётся из ключа, а не из заголовка токена
+    key = ring.get(jwt.get_unverified_header(token).get("kid"))
     decoded = jwt.decode(
         token,
-        public_key,
-        algorithms=[algorithm],
+        key.public_key,
+        algorithms=[key.algorithm],
     )
-    return decoded
 
+    if use_cache and "exp" in decoded:
+        verified_tokens.put(digest, decoded.copy(), decoded["exp"])
 
+    return decoded
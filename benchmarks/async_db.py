@@ -0,0 +1,102 @@
+"""
+Нагрузочное сравнение sync (threadpool) и async (aiosqlite) доступа к базе.
+
+Одинаковый запрос главной страницы (топ лидерборда + курсы) отдаётся
+sync-роутом через session_local и async-роутом через AsyncSession,
+клиент держит CONCURRENCY одновременных запросов.
+
+Запуск из корня проекта (нужен httpx):
+    python -m benchmarks.async_db [requests] [concurrency]
+"""
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, Depends
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import sessionmaker, Session
+
+from benchmarks.leaderboard import fill
+from database import Base
+from models import Course
+from utils import leaderboard
+
+
+REQUESTS = 2000
+CONCURRENCY = 200
+USERS = 10_000
+
+
+def build_app(db_path: Path) -> FastAPI:
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    session_local = sessionmaker(bind=engine, autoflush=False)
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async_session_local = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_db():
+        with session_local() as db:
+            yield db
+
+    async def get_async_db():
+        async with async_session_local() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_index(db: Session = Depends(get_db)):
+        leaders = leaderboard.get_top(db)
+        courses = db.scalars(select(Course).limit(3)).all()
+        return {"leaders": leaders, "courses": len(courses)}
+
+    @app.get("/async")
+    async def async_index(db: AsyncSession = Depends(get_async_db)):
+        leaders = await db.run_sync(leaderboard.get_top)
+        courses = (await db.scalars(select(Course).limit(3))).all()
+        return {"leaders": leaders, "courses": len(courses)}
+
+    Base.metadata.create_all(bind=engine)
+    fill(engine, USERS)
+    # aiosqlite держит по потоку на соединение, без dispose процесс не завершится
+    app.state.async_engine = async_engine
+    return app
+
+
+async def load(app: FastAPI, path: str, requests: int, concurrency: int) -> tuple[float, float]:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    p99 = statistics.quantiles(latencies, n=100)[98] * 1000
+    return requests / elapsed, p99
+
+
+async def main(requests: int, concurrency: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(Path(tmp) / "bench.db")
+        for path in ("/sync", "/async"):
+            rps, p99 = await load(app, path, requests, concurrency)
+            print(f"{path:>6}: {rps:8.1f} req/s | p99 {p99:8.1f} ms")
+        await app.state.async_engine.dispose()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [REQUESTS, CONCURRENCY][len(args):])))
@@ -0,0 +1,51 @@
+"""
+Стоимость подписи и проверки токенов для RS256, ES256 и EdDSA
+через create_access_token/create_refresh_token.
+
+Ключи генерируются в памяти, certs/ не нужен для них,
+но импорт auth.utils_jwt загружает основное кольцо из настроек.
+
+Запуск из корня проекта:
+    python -m benchmarks.jwt_algorithms [итераций]
+"""
+import sys
+import time
+
+from auth import utils_jwt
+from auth.keyring import KeyRing, SigningKey
+from schemas.users import Principal
+from utils.helpers import create_access_token, create_refresh_token
+
+
+ITERATIONS = 1000
+ALGORITHMS = ["RS256", "ES256", "EdDSA"]
+
+
+def per_second(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - start)
+
+
+def main(iterations: int) -> None:
+    user = Principal(id=1, login="bench", nickname="bench")
+    default_ring = utils_jwt.keyring
+
+    for algorithm in ALGORITHMS:
+        ring = KeyRing([SigningKey.generate(algorithm.lower(), algorithm)], algorithm.lower())
+        utils_jwt.keyring = ring
+        try:
+            access = per_second(lambda: create_access_token(user), iterations)
+            refresh = per_second(lambda: create_refresh_token(user), iterations)
+            token = create_access_token(user)
+            # Явное кольцо отключает кэш, меряем настоящую проверку подписи
+            verify = per_second(lambda: utils_jwt.decode_jwt(token, ring), iterations)
+        finally:
+            utils_jwt.keyring = default_ring
+
+        print(f"{algorithm:>6}: access {access:8.0f}/s | refresh {refresh:8.0f}/s | verify {verify:8.0f}/s | {len(token)} bytes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS)
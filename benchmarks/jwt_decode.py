@@ -0,0 +1,42 @@
+"""
+Пропускная способность проверки access-токена:
+PEM-текст в jwt.decode (как было), разобранный ключ, кэш проверенных токенов.
+
+Запуск из корня проекта (нужны ключи в certs/):
+    python -m benchmarks.jwt_decode [итераций]
+"""
+import sys
+import time
+
+import jwt
+
+from auth import utils_jwt
+from config.settings import settings
+
+
+ITERATIONS = 2000
+
+
+def measure(name: str, func, iterations: int) -> None:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    print(f"{name:>22}: {iterations / elapsed:10.0f} decodes/s")
+
+
+def main(iterations: int) -> None:
+    token = utils_jwt.encode_jwt({"sub": "1", "login": "bench", "type": "access"})
+    key = utils_jwt.keyring.active
+    public_pem = settings.auth_jwt.public_key_path.read_text()
+    algorithms = [key.algorithm]
+
+    measure("PEM text (before)", lambda: jwt.decode(token, public_pem, algorithms=algorithms), iterations)
+    measure("pre-parsed key", lambda: jwt.decode(token, key.public_key, algorithms=algorithms), iterations)
+
+    utils_jwt.verified_tokens.clear()
+    measure("verified-token cache", lambda: utils_jwt.decode_jwt(token), iterations)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS)
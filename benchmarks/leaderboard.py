@@ -0,0 +1,85 @@
+"""
+Замер лидерборда главной страницы на 10k/100k/1M пользователей.
+
+Запуск из корня проекта:
+    python -m benchmarks.leaderboard [10000 100000 1000000]
+"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import User, GamificationRecord
+from utils import leaderboard
+
+
+SIZES = [10_000, 100_000, 1_000_000]
+REPEATS = 50
+# Старый вариант грузит всю таблицу в ORM с N+1, на 100k это уже минуты
+FULL_SCAN_LIMIT = 10_000
+
+
+def fill(engine, size: int) -> None:
+    random.seed(size)
+    users = [{"id": i, "login": f"user{i}", "nickname": f"user{i}"} for i in range(1, size + 1)]
+    records = []
+    for i in range(1, size + 1):
+        lvl, xp = random.randint(1, 50), random.randint(0, 99)
+        records.append({
+            "id": i,
+            "user_id": i,
+            "lvl": lvl,
+            "xp": xp,
+            "currency": 0,
+            "points": GamificationRecord.calculate_points(lvl, xp)
+        })
+
+    with engine.begin() as connection:
+        connection.execute(insert(User), users)
+        connection.execute(insert(GamificationRecord), records)
+
+
+def full_scan(db) -> list:
+    """Прежняя реализация get_leaderboard"""
+    leaderboard_list = []
+    for user in db.query(User).all():
+        leaderboard_list.append((user.nickname, GamificationRecord.calculate_points(user.gamerec.lvl, user.gamerec.xp)))
+    leaderboard_list.sort(key=lambda x: x[1], reverse=True)
+    return leaderboard_list[:leaderboard.LEADERBOARD_SIZE]
+
+
+def measure(func, db, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func(db)
+        db.expunge_all()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def run(size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(bind=engine)
+        fill(engine, size)
+
+        db = sessionmaker(bind=engine)()
+        indexed = measure(leaderboard.get_top, db, REPEATS)
+        line = f"{size:>9} users | indexed top-5: {indexed:8.3f} ms"
+
+        if size <= FULL_SCAN_LIMIT:
+            scan = measure(full_scan, db, 1)
+            line += f" | full scan: {scan:10.1f} ms"
+
+        print(line)
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    for size in [int(arg) for arg in sys.argv[1:]] or SIZES:
+        run(size)
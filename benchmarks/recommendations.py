@@ -0,0 +1,65 @@
+"""
+Рекомендация курса по результату теста: матрица CourseRecommender
+против прохода по курсам в Python на каталогах разного размера.
+
+Запуск из корня проекта:
+    python -m benchmarks.recommendations [повторов]
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from utils.recommendations import CourseRecommender, OTHER_COURSES
+
+
+SIZES = (10, 1_000, 10_000)
+REPEATS = 2_000
+BATCH = 1_000
+
+
+def python_recommend(rows: list[tuple], creative: float, analytical: float) -> list[int]:
+    """Тот же выбор без NumPy: расстояние до каждого курса и сортировка"""
+    ranked = sorted(rows, key=lambda row: ((creative - row[1]) ** 2 + (analytical - row[2]) ** 2, row[0]))
+    return [row[0] for row in ranked[:OTHER_COURSES + 1]]
+
+
+def timed(func, repeats: int) -> float:
+    """Медиана одного вызова в микросекундах"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return sorted(samples)[len(samples) // 2] * 1e6
+
+
+def main(repeats: int) -> None:
+    random.seed(0)
+    for size in SIZES:
+        rows = [(id, random.uniform(0, 10), random.uniform(0, 10)) for id in range(1, size + 1)]
+        recommender = CourseRecommender(rows, version=0)
+        scores = [(random.randint(0, 10), random.randint(0, 10)) for _ in range(repeats)]
+
+        # Результаты обоих способов должны совпадать
+        for creative, analytical in scores[:100]:
+            recommended, others = recommender.recommend(creative, analytical)
+            assert [recommended, *others] == python_recommend(rows, creative, analytical)
+
+        it = iter(scores * 2)
+        numpy_us = timed(lambda: recommender.recommend(*next(it)), repeats)
+        python_repeats = max(repeats // 20, 10)
+        python_us = timed(lambda: python_recommend(rows, *next(it)), python_repeats)
+
+        batch = np.array(scores[:BATCH], dtype=np.float64)
+        start = time.perf_counter()
+        recommender.top_k(batch, OTHER_COURSES + 1)
+        batch_us = (time.perf_counter() - start) / len(batch) * 1e6
+
+        print(f"{size:>6} courses: numpy {numpy_us:8.1f} us | python {python_us:9.1f} us | "
+              f"batch of {len(batch)} {batch_us:6.2f} us/result")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else REPEATS)
@@ -0,0 +1,98 @@
+"""
+Конкурентные чтения и записи в SQLite: стандартный rollback journal
+против профиля SqlitePragmas (WAL, synchronous=NORMAL, ...).
+
+Читатели крутят запрос лидерборда, писатели начисляют xp, как при
+прохождении тем. Считаем операции в секунду и ошибки "database is locked".
+
+Запуск из корня проекта:
+    python -m benchmarks.sqlite_concurrency [секунд] [читателей] [писателей]
+"""
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.leaderboard import fill
+from config.settings import SqlitePragmas
+from database import Base, use_sqlite_pragmas
+from models import GamificationRecord
+from utils import leaderboard
+
+
+DURATION = 5
+READERS = 8
+WRITERS = 2
+USERS = 10_000
+
+
+def run(pragmas: SqlitePragmas | None, duration: float, readers: int, writers: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(
+            f"sqlite:///{Path(tmp) / 'bench.db'}",
+            connect_args={"check_same_thread": False},
+            pool_size=readers + writers
+        )
+        use_sqlite_pragmas(engine, pragmas)
+        Base.metadata.create_all(bind=engine)
+        fill(engine, USERS)
+        session_local = sessionmaker(bind=engine)
+
+        counters = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+        stop = time.perf_counter() + duration
+
+        def count(name: str) -> None:
+            with lock:
+                counters[name] += 1
+
+        def reader() -> None:
+            with session_local() as db:
+                while time.perf_counter() < stop:
+                    try:
+                        leaderboard.get_top(db)
+                        db.rollback()
+                        count("reads")
+                    except OperationalError:
+                        db.rollback()
+                        count("locked")
+
+        def writer() -> None:
+            with session_local() as db:
+                while time.perf_counter() < stop:
+                    try:
+                        record = db.get(GamificationRecord, random.randint(1, USERS))
+                        record.xp += 1 # type: ignore
+                        db.commit()
+                        count("writes")
+                    except OperationalError:
+                        db.rollback()
+                        count("locked")
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        engine.dispose()
+        return {name: value / duration for name, value in counters.items()}
+
+
+def main(duration: float, readers: int, writers: int) -> None:
+    profiles = {"rollback journal": None, "performance profile": SqlitePragmas()}
+    for name, pragmas in profiles.items():
+        result = run(pragmas, duration, readers, writers)
+        print(f"{name:>20}: reads {result['reads']:8.0f}/s | writes {result['writes']:6.0f}/s | locked {result['locked']:5.1f}/s")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [DURATION, READERS, WRITERS][len(args):]))
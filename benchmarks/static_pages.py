@@ -0,0 +1,86 @@
+"""
+Статичные страницы (/help, /partners, ...): TemplateResponse на каждый
+запрос против кэша готовых байт из utils.page_cache, и ответ 304 по ETag.
+
+Время самого обработчика и запросы в секунду через TestClient.
+Базу не трогает: приложение собирается только из routers.base.
+
+Запуск из корня проекта:
+    python -m benchmarks.static_pages [запросов]
+"""
+import sys
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.staticfiles import StaticFiles
+from fastapi.testclient import TestClient
+
+from routers import base
+from templates import templates
+
+
+PAGES = ("help", "partners", "vacancies", "team", "contacts")
+REQUESTS = 2_000
+
+
+def render_page(request: Request):
+    """Прежнее поведение: шаблон рендерится на каждый запрос"""
+    name = request.path_params["name"]
+    return templates.TemplateResponse(request=request, name=f"{name}.html", context={"request": request})
+
+
+def handler_time(route, request: Request, repeats: int) -> float:
+    """Медиана одного вызова обработчика в микросекундах"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        route(request)
+        samples.append(time.perf_counter() - start)
+    return sorted(samples)[len(samples) // 2] * 1e6
+
+
+def timed(client: TestClient, path: str, requests: int, headers: dict | None = None) -> tuple[float, int, int]:
+    """Запросов в секунду, размер тела и код последнего ответа"""
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(path, headers=headers)
+    return requests / (time.perf_counter() - start), len(response.content), response.status_code
+
+
+def main(requests: int) -> None:
+    app = FastAPI()
+    app.mount("/static", StaticFiles(directory="web/static"), name="static")
+    app.include_router(base.router)
+    app.add_api_route("/benchmark/render/{name}", render_page)
+    client = TestClient(app)
+    routes = {route.name: route.endpoint for route in app.routes if hasattr(route, "endpoint")}
+
+    for page in PAGES:
+        request = Request({
+            "type": "http", "method": "GET", "path": f"/{page}", "query_string": b"", "headers": [],
+            "scheme": "http", "server": ("testserver", 80), "app": app, "router": app.router,
+            "path_params": {"name": page},
+        })
+        render_us = handler_time(render_page, request, requests)
+        cached_us = handler_time(routes[page], request, requests)
+        print(f"{page:>10}: handler render {render_us:7.1f} us | cached {cached_us:5.1f} us")
+
+    for page in PAGES:
+        etag = client.get(f"/{page}").headers["etag"]
+        results = {
+            "render": timed(client, f"/benchmark/render/{page}", requests, {"accept-encoding": "identity"}),
+            "cached": timed(client, f"/{page}", requests, {"accept-encoding": "identity"}),
+            "gzip": timed(client, f"/{page}", requests, {"accept-encoding": "gzip"}),
+            "304": timed(client, f"/{page}", requests, {"if-none-match": etag}),
+        }
+        print(f"{page:>10}: " + " | ".join(
+            f"{name} {rps:6.0f} req/s" for name, (rps, _, _) in results.items()
+        ))
+
+    response = client.get("/help", headers={"accept-encoding": "gzip"})
+    print(f"/help: {len(client.get('/help', headers={'accept-encoding': 'identity'}).content)} bytes, "
+          f"gzip on the wire {response.headers.get('content-length')} bytes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else REQUESTS)
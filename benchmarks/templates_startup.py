@@ -0,0 +1,67 @@
+"""
+Холодный старт шаблонов: компиляция из исходников против загрузки
+байткода из FileSystemBytecodeCache, и поиск уже загруженного шаблона.
+
+Каждый замер - новое окружение Jinja, как в новом процессе воркера.
+Кэш байткода пишется во временный каталог, настоящий не трогается.
+
+Запуск из корня проекта:
+    python -m benchmarks.templates_startup [повторов]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader
+
+from templates import CountingBytecodeCache, templates_folder
+
+
+REPEATS = 20
+
+
+def make_env(cache: CountingBytecodeCache | None) -> Environment:
+    return Environment(loader=FileSystemLoader(templates_folder), autoescape=True, bytecode_cache=cache)
+
+
+def load_all(env: Environment, names: list[str]) -> dict[str, float]:
+    timings = {}
+    for name in names:
+        start = time.perf_counter()
+        env.get_template(name)
+        timings[name] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def median(samples: list[float]) -> float:
+    return sorted(samples)[len(samples) // 2]
+
+
+def main(repeats: int) -> None:
+    names = make_env(None).list_templates(extensions=("html",))
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CountingBytecodeCache(Path(directory))
+        # Прогрев: заполняем кэш байткода на диске
+        load_all(make_env(cache), names)
+
+        source = [load_all(make_env(None), names) for _ in range(repeats)]
+        bytecode = [load_all(make_env(cache), names) for _ in range(repeats)]
+
+    env = make_env(None)
+    load_all(env, names)
+    memory = [load_all(env, names) for _ in range(repeats)]
+
+    print(f"{len(names)} templates, median of {repeats} runs")
+    for title, runs in (("source", source), ("bytecode", bytecode), ("in memory", memory)):
+        print(f"{title:>10}: {median([sum(run.values()) for run in runs]):7.2f} ms total")
+
+    print("slowest to compile:")
+    per_template = {name: median([run[name] for run in source]) for name in names}
+    for name in sorted(per_template, key=per_template.get, reverse=True)[:5]:
+        cached = median([run[name] for run in bytecode])
+        print(f"  {name:>24}: source {per_template[name]:6.2f} ms | bytecode {cached:5.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else REPEATS)
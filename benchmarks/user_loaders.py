@@ -0,0 +1,100 @@
+"""
+Число SQL-запросов и строк в результатах при загрузке одного пользователя:
+старый граф из десяти joinedload против профилей USER_LOAD_PROFILES.
+
+Запуск из корня проекта:
+    python -m benchmarks.user_loaders [размер каждой связи]
+"""
+import sys
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, joinedload
+
+from database import Base
+from models import (
+    User,
+    UserProfile,
+    GamificationRecord,
+    Frame,
+    Title,
+    Avatar,
+    Achievement,
+    Course,
+    Topic
+)
+from routers.users import USER_LOAD_PROFILES
+
+
+RELATION_SIZE = 5
+
+
+OLD_GRAPH = (
+    joinedload(User.profile).joinedload(UserProfile.available_frames),
+    joinedload(User.profile).joinedload(UserProfile.current_frame),
+    joinedload(User.profile).joinedload(UserProfile.available_titles),
+    joinedload(User.profile).joinedload(UserProfile.current_title),
+    joinedload(User.profile).joinedload(UserProfile.achievements),
+    joinedload(User.profile).joinedload(UserProfile.available_avatars),
+    joinedload(User.profile).joinedload(UserProfile.current_avatar),
+    joinedload(User.gamerec),
+    joinedload(User.courses),
+    joinedload(User.completed_topics)
+)
+
+
+def seed(db, size: int) -> int:
+    courses = [Course(name=f"course{i}") for i in range(size)]
+    profile = UserProfile(
+        available_frames=[Frame(name=f"frame{i}") for i in range(size)],
+        available_titles=[Title(name=f"title{i}") for i in range(size)],
+        available_avatars=[Avatar(name=f"avatar{i}", image_url="") for i in range(size)],
+        achievements=[Achievement(name=f"achievement{i}") for i in range(size)]
+    )
+    user = User(
+        login="user",
+        nickname="user",
+        profile=profile,
+        gamerec=GamificationRecord(),
+        courses=courses,
+        completed_topics=[Topic(name=f"topic{i}") for i in range(size * 2)]
+    )
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+class Counter:
+    def __init__(self, engine):
+        self.queries = 0
+        self.rows = 0
+        event.listen(engine, "after_cursor_execute", self.after_execute)
+
+    def after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return
+        self.queries += 1
+        # Пересчитываем тот же запрос, чтобы узнать, сколько строк он вернул
+        count_cursor = cursor.connection.cursor()
+        self.rows += count_cursor.execute(f"SELECT count(*) FROM ({statement})", parameters).fetchone()[0]
+        count_cursor.close()
+
+
+def main(size: int) -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session_local = sessionmaker(bind=engine)
+
+    with session_local() as db:
+        user_id = seed(db, size)
+
+    profiles = {"old joinedload graph": OLD_GRAPH, **USER_LOAD_PROFILES}
+    for name, options in profiles.items():
+        counter = Counter(engine)
+        with session_local() as db:
+            db.query(User).options(*options).filter(User.id == user_id).first()
+        event.remove(engine, "after_cursor_execute", counter.after_execute)
+        print(f"{name:>22}: {counter.queries:2} queries, {counter.rows:7} rows")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else RELATION_SIZE)
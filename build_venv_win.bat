@@ -1,4 +1,5 @@
 py -m venv .venv
 .venv\Scripts\activate
 
-py -m pip install -r requirements.txt
\ No newline at end of file
+py -m pip install -r requirements.txt
+py -m assets
@@ -1,7 +1,8 @@
 
 from pathlib import Path
+from typing import Literal, Optional
 from pydantic import BaseModel
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 BASE_DIR = Path(__file__).parent.parent
@@ -9,16 +10,73 @@ BASE_DIR = Path(__file__).parent.parent
 print(BASE_DIR)
 
 
+class JwtKey(BaseModel):
+    kid: str
+    algorithm: Literal["RS256", "ES256", "EdDSA"] = "RS256"
+    # Без приватного ключа ключ только проверяет подписи (после ротации)
+    private_key_path: Optional[Path] = None
+    public_key_path: Path
+
+
 class AuthJwt(BaseModel):
     private_key_path: Path = BASE_DIR / "certs" / "jwt-private.pem"
     public_key_path: Path = BASE_DIR / "certs" / "jwt-public.pem"
     algorithm: str = "RS256"
+    # Кольцо ключей: подписываем active_kid, проверяем по kid из заголовка.
+    # Пустой список = один ключ legacy_kid из private_key_path/public_key_path
+    keys: list[JwtKey] = []
+    active_kid: str = "default"
+    # Этим ключом проверяются токены без kid, выпущенные до ротации
+    legacy_kid: str = "default"
     access_token_expire_minutes: int = 60 * 24 * 30
     refresh_token_expire_days: int = 30
+    principal_cache_size: int = 1024
+    principal_cache_ttl_seconds: int = 60
+    verified_token_cache_size: int = 4096
     
     
+class SqlitePragmas(BaseModel):
+    """PRAGMA, выполняемые на каждом новом соединении с SQLite"""
+    # WAL: читатели не блокируются писателем
+    journal_mode: str = "WAL"
+    # В WAL режиме NORMAL безопасен для целостности и не делает fsync на каждый commit
+    synchronous: str = "NORMAL"
+    busy_timeout: int = 5000 # мс ожидания блокировки вместо "database is locked"
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size: int = -64 * 1024 # отрицательное значение - размер в КиБ
+    temp_store: str = "MEMORY"
+    foreign_keys: bool = False
+
+
+class Database(BaseModel):
+    url: str = "sqlite:///./cyberskill.db"
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    echo: bool = False
+    # None - стандартные настройки SQLite (rollback journal)
+    sqlite_pragmas: Optional[SqlitePragmas] = SqlitePragmas()
+
+
+class Templates(BaseModel):
+    # Скомпилированные шаблоны на диске переживают перезапуск. None - без кэша
+    bytecode_cache_dir: Optional[Path] = BASE_DIR / ".jinja_cache"
+    # Компилировать все шаблоны при старте, а не на первом запросе к каждому
+    precompile: bool = True
+
+
+class Avatars(BaseModel):
+    # Процессы для миниатюр: Pillow на больших картинках занимает ядро целиком
+    variant_workers: int = 2
+
+
 class Settings(BaseSettings):
+    # Вложенные поля из окружения: DB__URL, DB__POOL_SIZE, ...
+    model_config = SettingsConfigDict(env_nested_delimiter="__")
     
     auth_jwt: AuthJwt = AuthJwt()
+    db: Database = Database()
+    templates: Templates = Templates()
+    avatars: Avatars = Avatars()
 
 settings = Settings()
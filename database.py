@@ -1,12 +1,56 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, Engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQL_DB_URL = "sqlite:///./cyberskill.db"
+from config.settings import settings, SqlitePragmas
 
-engine = create_engine(SQL_DB_URL, connect_args={"check_same_thread": False})
+SQL_DB_URL = settings.db.url
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: SqlitePragmas) -> None:
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.model_dump().items():
+        if isinstance(value, bool):
+            value = "ON" if value else "OFF"
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+
+def use_sqlite_pragmas(engine: Engine, pragmas: SqlitePragmas | None) -> None:
+    if pragmas is None or engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+
+engine = create_engine(
+    SQL_DB_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=settings.db.pool_size,
+    max_overflow=settings.db.max_overflow,
+    pool_timeout=settings.db.pool_timeout,
+    echo=settings.db.echo
+)
+use_sqlite_pragmas(engine, settings.db.sqlite_pragmas)
 
 session_local = sessionmaker(autoflush=False, autocommit=False, bind=engine)
 
-Base = declarative_base()
+# Асинхронный доступ к той же базе для async-роутов
+ASYNC_SQL_DB_URL = SQL_DB_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+async_engine = create_async_engine(
+    ASYNC_SQL_DB_URL,
+    pool_size=settings.db.pool_size,
+    max_overflow=settings.db.max_overflow,
+    pool_timeout=settings.db.pool_timeout,
+    echo=settings.db.echo
+)
+use_sqlite_pragmas(async_engine.sync_engine, settings.db.sqlite_pragmas)
 
+# expire_on_commit=False: после commit в async нельзя лениво перечитывать атрибуты
+async_session_local = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+Base = declarative_base()
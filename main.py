@@ -1,9 +1,12 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import (
     FastAPI,
 )   
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine
-from fastapi.staticfiles import StaticFiles
+from database import engine, session_local
+from assets.staticfiles import PrecompressedStaticFiles
 
 from routers import achievements
 from routers import admin
@@ -16,14 +19,36 @@ from routers import users
 from routers import avatars
 from routers import goods
 from routers import skilltest
+from routers import leaderboard
 
-from database import Base
 from utils.functions import get_origins
+from migrations.runner import check_schema
+from migrations.versions import MIGRATIONS
+from utils.test_stats import submission_writer
+from config.settings import settings
+from templates import precompile_templates, print_report
+from media.pipeline import avatar_pipeline
+from media.storage import IMMUTABLE_PATH
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.templates.precompile:
+        print_report(precompile_templates())
+    flusher = asyncio.create_task(submission_writer.flush_periodically())
+    yield
+    flusher.cancel()
+    with suppress(asyncio.CancelledError):
+        await flusher
+    # Отправки теста, не набравшие пачку, пишем перед остановкой
+    with session_local() as db:
+        submission_writer.flush(db)
+    avatar_pipeline.shutdown()
 
 
-app = FastAPI()
-app.mount("/static", StaticFiles(directory="web/static"), name="static")
-Base.metadata.create_all(bind=engine)
+app = FastAPI(lifespan=lifespan)
+app.mount("/static", PrecompressedStaticFiles(directory="web/static", immutable=(IMMUTABLE_PATH,)), name="static")
+check_schema(engine, MIGRATIONS)
 
 
 
@@ -47,3 +72,4 @@ app.include_router(topics.router)
 app.include_router(users.router)
 app.include_router(avatars.router)
 app.include_router(goods.router)
+app.include_router(leaderboard.router)
@@ -0,0 +1,37 @@
+"""
+Обслуживание загруженных аватаров:
+    python -m media variants
+    python -m media gc [--dry-run]
+"""
+import argparse
+
+from database import session_local
+from media.pipeline import avatar_pipeline
+from media.storage import GC_MIN_AGE_SECONDS, collect_garbage
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m media")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("variants", help="миниатюры для аватаров, у которых их нет")
+    gc_parser = commands.add_parser("gc", help="удалить файлы, на которые не ссылается ни один аватар")
+    gc_parser.add_argument("--dry-run", action="store_true", help="только показать файлы")
+    gc_parser.add_argument("--min-age", type=float, default=GC_MIN_AGE_SECONDS, help="не трогать файлы моложе, секунд")
+    args = parser.parse_args()
+
+    if args.command == "variants":
+        with session_local() as db:
+            done, failed = avatar_pipeline.process_missing(db)
+        avatar_pipeline.shutdown()
+        print(f"Variants: {done} avatars processed, {failed} failed")
+
+    elif args.command == "gc":
+        with session_local() as db:
+            removed = collect_garbage(db, args.min_age, args.dry_run)
+        for path in removed:
+            print(path)
+        print(f"{'Would remove' if args.dry_run else 'Removed'} {len(removed)} files")
+
+
+if __name__ == "__main__":
+    main()
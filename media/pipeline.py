@@ -0,0 +1,101 @@
+"""
+Фоновая обработка загруженных аватаров: варианты считаются в пуле
+процессов, чтобы не отнимать потоки и GIL у запросов, и записываются
+в Avatar.variants. Пока вариантов нет, шаблоны отдают оригинал.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from database import session_local
+from media.storage import VARIANTS_DIR, VARIANTS_URL, source_path
+from media.variants import render_variants
+from models import Avatar
+from utils.catalog_cache import catalog_cache
+
+
+def save_variants(db: Session, variants: dict[int, dict]) -> None:
+    db.execute(update(Avatar), [{"id": id, "variants": value} for id, value in variants.items()])
+    catalog_cache.touch(db, Avatar)
+    db.commit()
+
+
+class VariantPipeline:
+    """Пул процессов создаётся при первой загрузке, а не при импорте"""
+
+    def __init__(self, workers: int = settings.avatars.variant_workers):
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = Lock()
+
+    def pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def render(self, image_url: str):
+        return self.pool().submit(render_variants, str(source_path(image_url)), str(VARIANTS_DIR), VARIANTS_URL)
+
+    async def process(self, avatar_id: int, image_url: str) -> None:
+        """Фоновая задача после загрузки аватара"""
+        def rendered() -> dict | None:
+            # Та же картинка, загруженная раньше, могла успеть получить варианты
+            with session_local() as db:
+                return db.scalar(
+                    select(Avatar.variants).where(Avatar.image_url == image_url, Avatar.variants.is_not(None)).limit(1)
+                )
+
+        try:
+            variants = await run_in_threadpool(rendered) or await asyncio.wrap_future(self.render(image_url))
+        except Exception as exc:
+            # Битая картинка не мешает аватару: остаётся оригинал
+            self.failed += 1
+            print(f"Avatar {avatar_id}: variants failed: {exc!r}")
+            return
+
+        def save() -> None:
+            with session_local() as db:
+                save_variants(db, {avatar_id: variants})
+
+        await run_in_threadpool(save)
+        self.processed += 1
+
+    def process_missing(self, db: Session) -> tuple[int, int]:
+        """Варианты для аватаров, у которых их ещё нет. (готово, ошибок)"""
+        avatars = db.execute(select(Avatar.id, Avatar.image_url).where(Avatar.variants.is_(None))).all()
+        # Одинаковые картинки лежат одним файлом и считаются один раз
+        futures = {image_url: self.render(image_url) for image_url in {image_url for _, image_url in avatars}}
+
+        rendered = {}
+        for image_url, future in futures.items():
+            try:
+                rendered[image_url] = future.result()
+            except Exception as exc:
+                print(f"{image_url}: variants failed: {exc!r}")
+
+        variants = {id: rendered[image_url] for id, image_url in avatars if image_url in rendered}
+        if variants:
+            save_variants(db, variants)
+        self.processed += len(variants)
+        self.failed += len(avatars) - len(variants)
+        return len(variants), len(avatars) - len(variants)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "processed": self.processed, "failed": self.failed}
+
+
+avatar_pipeline = VariantPipeline()
@@ -0,0 +1,70 @@
+"""
+Хранилище загруженных аватаров: файлы называются по SHA-256 содержимого,
+поэтому одинаковые картинки лежат одним файлом, а адрес файла меняется
+вместе с содержимым и его можно кэшировать навсегда.
+"""
+import re
+import time
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from config.settings import BASE_DIR
+from models import Avatar
+
+
+AVATARS_DIR = BASE_DIR / "web" / "static" / "img" / "avatars"
+VARIANTS_DIR = AVATARS_DIR / "variants"
+VARIANTS_URL = "/static/img/avatars/variants"
+
+# Путь внутри static, который никогда не меняет содержимое: оригинал и его варианты
+IMMUTABLE_PATH = re.compile(r"img/avatars/(?:variants/)?[0-9a-f]{64}(?:-\d+)?\.\w+")
+# Загрузки: по хэшу и старые с uuid4 в имени. avatar1.jpg и т.п. - часть сайта, их не трогаем
+UPLOAD_NAME = re.compile(r"(?P<stem>[0-9a-f]{64}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})\.\w+")
+VARIANT_NAME = re.compile(r"(?P<stem>.+)-\d+\.\w+")
+# Временные файлы недописанных загрузок и вариантов
+TEMP_NAME = re.compile(r"\.upload-.*|\..+\.tmp")
+
+# Файл уже записан, а строка Avatar ещё не закоммичена - такие не удаляем
+GC_MIN_AGE_SECONDS = 3600
+
+
+def source_path(image_url: str) -> Path:
+    # В базе встречаются пути с обратными слэшами, сохранённые под Windows
+    return BASE_DIR / image_url.replace("\\", "/").lstrip("/")
+
+
+def stored_url(path: Path) -> str:
+    """Значение Avatar.image_url для файла: путь от корня проекта"""
+    return "/" + path.relative_to(BASE_DIR).as_posix()
+
+
+def files(directory: Path) -> list[Path]:
+    return [path for path in directory.iterdir() if path.is_file()] if directory.is_dir() else []
+
+
+def garbage(db: Session, min_age: float = GC_MIN_AGE_SECONDS) -> list[Path]:
+    """Файлы загрузок и вариантов, на которые не ссылается ни один Avatar.image_url"""
+    referenced = {source_path(image_url).name for image_url in db.scalars(select(Avatar.image_url)) if image_url}
+    stems = {Path(name).stem for name in referenced}
+
+    candidates = []
+    for path in files(AVATARS_DIR):
+        if TEMP_NAME.fullmatch(path.name) or (UPLOAD_NAME.fullmatch(path.name) and path.name not in referenced):
+            candidates.append(path)
+    for path in files(VARIANTS_DIR):
+        match = VARIANT_NAME.fullmatch(path.name)
+        if TEMP_NAME.fullmatch(path.name) or (match and match["stem"] not in stems):
+            candidates.append(path)
+
+    deadline = time.time() - min_age
+    return [path for path in candidates if path.stat().st_mtime < deadline]
+
+
+def collect_garbage(db: Session, min_age: float = GC_MIN_AGE_SECONDS, dry_run: bool = False) -> list[Path]:
+    found = garbage(db, min_age)
+    if not dry_run:
+        for path in found:
+            path.unlink(missing_ok=True)
+    return found
@@ -0,0 +1,64 @@
+"""
+Варианты аватара: квадратные миниатюры нескольких размеров в AVIF и WebP.
+
+Модуль выполняется в процессах пула, поэтому зависит только от Pillow:
+ни базы, ни настроек приложения здесь нет.
+"""
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+from PIL import Image, ImageOps
+
+
+# Ширины в пикселях: аватар в списке, на профиле и они же для экранов 2x
+WIDTHS = (64, 128, 256)
+# Порядок - предпочтение в <picture>: первый поддерживаемый браузером
+FORMATS = {
+    "avif": {"quality": 50},
+    "webp": {"quality": 80, "method": 6},
+}
+
+
+def square(image: Image.Image) -> Image.Image:
+    """Поворот по EXIF и квадрат по центру, как аватар обрезается в вёрстке"""
+    image = ImageOps.exif_transpose(image)
+    image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+    side = min(image.size)
+    return ImageOps.fit(image, (side, side), Image.Resampling.LANCZOS)
+
+
+def render_variants(source: str, directory: str, url_prefix: str) -> dict[str, list[tuple[int, str]]]:
+    """Пишет варианты source в directory и возвращает {формат: [(ширина, url), ...]}.
+
+    Больше исходника не увеличиваем: самый маленький размер есть всегда,
+    остальные - пока не больше стороны квадрата.
+    """
+    target_dir = Path(directory)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    stem = Path(source).stem
+
+    with Image.open(source) as image:
+        # JPEG сразу декодируется в уменьшенном виде, не крупнее нужного
+        image.draft("RGB", (WIDTHS[-1], WIDTHS[-1]))
+        cropped = square(image)
+
+    variants: dict[str, list[tuple[int, str]]] = {name: [] for name in FORMATS}
+    for width in WIDTHS:
+        if width > cropped.width and width != WIDTHS[0]:
+            break
+        resized = cropped.resize((width, width), Image.Resampling.LANCZOS) if width != cropped.width else cropped
+
+        for name, options in FORMATS.items():
+            filename = f"{stem}-{width}.{name}"
+            # Своё имя у каждого процесса: одну картинку могут обрабатывать два сразу
+            with NamedTemporaryFile(dir=target_dir, prefix=f".{filename}.", suffix=".tmp", delete=False) as tmp:
+                try:
+                    resized.save(tmp, format=name.upper(), **options)
+                except BaseException:
+                    tmp.close()
+                    os.unlink(tmp.name)
+                    raise
+            os.replace(tmp.name, target_dir / filename)
+            variants[name].append((width, f"{url_prefix}/{filename}"))
+    return variants
@@ -0,0 +1,43 @@
+"""
+Управление схемой базы:
+    python -m migrations current
+    python -m migrations history
+    python -m migrations upgrade [версия]
+"""
+import argparse
+
+from database import engine
+from migrations.runner import current_version, head, upgrade
+from migrations.versions import MIGRATIONS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("current", help="текущая версия схемы")
+    commands.add_parser("history", help="список миграций")
+    upgrade_parser = commands.add_parser("upgrade", help="применить миграции")
+    upgrade_parser.add_argument("target", nargs="?", type=int, default=None)
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        version = current_version(connection)
+
+    if args.command == "current":
+        print(f"{version} (head {head(MIGRATIONS)})")
+
+    elif args.command == "history":
+        for migration in MIGRATIONS:
+            mark = "x" if migration.version <= version else " "
+            print(f"[{mark}] {migration.version:04} {migration.name}")
+
+    elif args.command == "upgrade":
+        applied = upgrade(engine, MIGRATIONS, args.target)
+        for migration in applied:
+            print(f"Applied migration {migration.version:04} {migration.name}")
+        if not applied:
+            print("Nothing to apply")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from typing import Callable, NamedTuple
+
+from sqlalchemy import Connection, Engine
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def current_version(connection: Connection) -> int:
+    # Версия схемы хранится в заголовке файла SQLite, читать её почти бесплатно
+    return connection.exec_driver_sql("PRAGMA user_version").scalar() # type: ignore
+
+
+def head(migrations: list[Migration]) -> int:
+    return migrations[-1].version if migrations else 0
+
+
+def upgrade(engine: Engine, migrations: list[Migration], target: int | None = None) -> list[Migration]:
+    """Применяет недостающие миграции, каждую в своей транзакции.
+
+    BEGIN IMMEDIATE сразу берёт блокировку записи: если несколько воркеров
+    стартуют одновременно, миграцию выполнит первый, остальные увидят
+    новую версию после ожидания.
+    """
+    target = head(migrations) if target is None else target
+    applied = []
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for migration in migrations:
+            if migration.version > target:
+                break
+
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                if current_version(connection) >= migration.version:
+                    connection.exec_driver_sql("COMMIT")
+                    continue
+
+                migration.upgrade(connection)
+                connection.exec_driver_sql(f"PRAGMA user_version = {int(migration.version)}")
+                connection.exec_driver_sql("COMMIT")
+            except Exception:
+                connection.exec_driver_sql("ROLLBACK")
+                raise
+
+            applied.append(migration)
+
+    return applied
+
+
+def check_schema(engine: Engine, migrations: list[Migration]) -> None:
+    """Проверка при старте воркера: одна PRAGMA вместо рефлексии всех таблиц"""
+    with engine.connect() as connection:
+        version = current_version(connection)
+
+    if version == head(migrations):
+        return
+
+    if version > head(migrations):
+        raise RuntimeError(f"Database schema version {version} is newer than code ({head(migrations)})")
+
+    for migration in upgrade(engine, migrations):
+        print(f"Applied migration {migration.version:04} {migration.name}")
@@ -0,0 +1,307 @@
+"""
+Снимки DDL выпущенных миграций. Миграции строят схему отсюда, а не из
+моделей: модели меняются, а выпущенный шаг должен давать ту же схему, что
+и при выпуске, чтобы новая база проходила те же шаги, что и старые.
+
+Не менять. IF NOT EXISTS: в базах без версии, созданных create_all,
+таблицы и индексы уже могут быть.
+"""
+
+
+# 0001: таблицы, которые create_all создавал из моделей до первой миграции
+INITIAL_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        login VARCHAR,
+        nickname VARCHAR,
+        password VARCHAR,
+        email VARCHAR,
+        role VARCHAR(7),
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS frames (
+        name VARCHAR,
+        img_href VARCHAR,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS titles (
+        name VARCHAR,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS courses (
+        name VARCHAR,
+        description VARCHAR,
+        price FLOAT,
+        course_lvl VARCHAR(8),
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS test_questions (
+        text VARCHAR,
+        "order" INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS avatars (
+        name VARCHAR,
+        image_url VARCHAR,
+        is_public BOOLEAN,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS goods (
+        name VARCHAR,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS student_course (
+        student_id INTEGER,
+        course_id INTEGER,
+        date DATETIME,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(student_id) REFERENCES users (id),
+        FOREIGN KEY(course_id) REFERENCES courses (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS users_profiles (
+        user_id INTEGER,
+        about_me VARCHAR,
+        current_frame_id INTEGER,
+        current_title_id INTEGER,
+        current_avatar_id INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id),
+        FOREIGN KEY(current_frame_id) REFERENCES frames (id),
+        FOREIGN KEY(current_title_id) REFERENCES titles (id),
+        FOREIGN KEY(current_avatar_id) REFERENCES avatars (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS game_records (
+        user_id INTEGER,
+        xp INTEGER,
+        lvl INTEGER,
+        currency INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS topics (
+        course_id INTEGER,
+        name VARCHAR,
+        content VARCHAR,
+        "order" INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(course_id) REFERENCES courses (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS test_answers (
+        question_id INTEGER,
+        text VARCHAR,
+        analytical_value INTEGER,
+        creative_value INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(question_id) REFERENCES test_questions (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS student_topic (
+        student_id INTEGER,
+        topic_id INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(student_id) REFERENCES users (id),
+        FOREIGN KEY(topic_id) REFERENCES topics (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_available_frames (
+        user_id INTEGER,
+        frame_id INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users_profiles (id),
+        FOREIGN KEY(frame_id) REFERENCES frames (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_available_titles (
+        user_id INTEGER,
+        title_id INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users_profiles (id),
+        FOREIGN KEY(title_id) REFERENCES titles (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_available_avatars (
+        user_profile_id INTEGER,
+        avatar_id INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_profile_id) REFERENCES users_profiles (id),
+        FOREIGN KEY(avatar_id) REFERENCES avatars (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_purchases (
+        user_id INTEGER,
+        item_id INTEGER,
+        date DATETIME,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users_profiles (id),
+        FOREIGN KEY(item_id) REFERENCES goods (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS course_purchases (
+        user_id INTEGER,
+        course_id INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users_profiles (id),
+        FOREIGN KEY(course_id) REFERENCES courses (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS profile_socials (
+        profile_id INTEGER,
+        social_type VARCHAR(8),
+        value VARCHAR,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(profile_id) REFERENCES users_profiles (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS achievements (
+        user_id INTEGER,
+        name VARCHAR,
+        description VARCHAR,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users_profiles (id)
+    )
+    """,
+)
+
+
+# 0003: индексы и уникальные ограничения моделей на тот момент, для старых баз.
+# (таблица, индекс, колонки, unique)
+MODEL_INDEXES = (
+    ("achievements", "ix_achievements_name", ("name",), False),
+    ("achievements", "ix_achievements_user_id", ("user_id",), False),
+    ("course_purchases", "ix_course_purchases_user_course", ("user_id", "course_id"), False),
+    ("courses", "ix_courses_course_lvl", ("course_lvl",), False),
+    ("game_records", "ix_game_records_leaderboard", ("points DESC", "user_id"), False),
+    ("game_records", "ix_game_records_user_id", ("user_id",), True),
+    ("goods", "ix_goods_name", ("name",), False),
+    ("profile_socials", "ix_profile_socials_profile_id", ("profile_id",), False),
+    ("student_course", "ix_student_course_course_id", ("course_id",), False),
+    ("student_course", "uq_student_course", ("student_id", "course_id"), True),
+    ("student_topic", "ix_student_topic_topic_id", ("topic_id",), False),
+    ("student_topic", "uq_student_topic", ("student_id", "topic_id"), True),
+    ("test_answers", "ix_test_answers_question_id", ("question_id",), False),
+    ("titles", "ix_titles_name", ("name",), False),
+    ("topics", "ix_topics_course_id", ("course_id",), False),
+    ("user_available_avatars", "uq_user_available_avatars", ("user_profile_id", "avatar_id"), True),
+    ("user_available_frames", "uq_user_available_frames", ("user_id", "frame_id"), True),
+    ("user_available_titles", "uq_user_available_titles", ("user_id", "title_id"), True),
+    ("user_purchases", "uq_user_purchases", ("user_id", "item_id"), True),
+    ("users", "ix_users_email", ("email",), False),
+    ("users", "ix_users_login", ("login",), False),
+    ("users_profiles", "ix_users_profiles_user_id", ("user_id",), True),
+)
+
+
+# 0005: отправки теста и их агрегаты
+TEST_SUBMISSION_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS test_submissions (
+        creative_score INTEGER,
+        analytical_score INTEGER,
+        date DATETIME,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS test_submission_answers (
+        submission_id INTEGER,
+        question_id INTEGER,
+        answer_id INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id),
+        FOREIGN KEY(submission_id) REFERENCES test_submissions (id)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_test_submission_answers_submission_id ON test_submission_answers (submission_id)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS test_answer_picks (
+        answer_id INTEGER,
+        picks INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_test_answer_picks ON test_answer_picks (answer_id)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS test_score_histogram (
+        axis VARCHAR,
+        score INTEGER,
+        count INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_test_score_histogram ON test_score_histogram (axis, score)
+    """,
+)
+
+
+# 0006: версии справочников для кэша каталогов
+CATALOG_VERSION_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS catalog_versions (
+        name VARCHAR,
+        version INTEGER,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_catalog_versions_name ON catalog_versions (name)
+    """,
+)
@@ -0,0 +1,194 @@
+"""
+Миграции схемы по порядку. Новую миграцию добавляем в конец MIGRATIONS
+со следующим номером; уже выпущенные не меняем.
+
+Схему выпущенные миграции берут из снимков DDL в migrations/snapshots.py,
+а не из текущих моделей. Миграции всё равно пишутся идемпотентными: базы без
+версии, созданные create_all, могут уже содержать часть изменений.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import Connection, DateTime, bindparam, inspect, text
+
+from migrations.snapshots import (
+    INITIAL_TABLES,
+    MODEL_INDEXES,
+    TEST_SUBMISSION_TABLES,
+    CATALOG_VERSION_TABLES
+)
+from migrations.runner import Migration
+from models import GamificationRecord
+
+
+def initial_schema(connection: Connection) -> None:
+    for statement in INITIAL_TABLES:
+        connection.exec_driver_sql(statement)
+
+
+def game_records_points(connection: Connection) -> None:
+    """Колонка points для лидерборда с пересчётом существующих записей"""
+    columns = {column["name"] for column in inspect(connection).get_columns("game_records")}
+    if "points" in columns:
+        return
+
+    connection.execute(text("ALTER TABLE game_records ADD COLUMN points INTEGER DEFAULT 0"))
+
+    # Пересчитываем в Python, чтобы округление совпадало с calculate_points
+    if records := connection.execute(text("SELECT id, lvl, xp FROM game_records")).all():
+        connection.execute(
+            text("UPDATE game_records SET points = :points WHERE id = :id"),
+            [
+                {"id": id, "points": GamificationRecord.calculate_points(lvl, xp)}
+                for id, lvl, xp in records
+            ]
+        )
+
+
+def deduplicate(connection: Connection, table: str, name: str, columns: tuple[str, ...]) -> int:
+    """Убирает повторы по колонкам уникального индекса перед его созданием.
+
+    Удаляются только полные копии строки (совпадают все колонки, кроме id)
+    в таблицах, на которые не ссылаются внешние ключи. Строки с NULL в ключе
+    не трогаем: уникальный индекс SQLite их допускает. Если повторы
+    различаются данными или на них могут ссылаться, миграция останавливается
+    со списком повторов - выбирать, какую запись оставить, должен человек.
+    """
+    inspector = inspect(connection)
+    keys = [f'"{column}"' for column in columns]
+    key_not_null = " AND ".join(f"{key} IS NOT NULL" for key in keys)
+
+    removed = 0
+    referenced = any(
+        foreign_key["referred_table"] == table
+        for other in inspector.get_table_names()
+        for foreign_key in inspector.get_foreign_keys(other)
+    )
+    if not referenced:
+        other_columns = ", ".join(
+            f'"{column["name"]}"' for column in inspector.get_columns(table)
+            if column["name"] != "id"
+        )
+        removed = connection.execute(text(
+            f'DELETE FROM "{table}" WHERE {key_not_null} AND id NOT IN '
+            f'(SELECT MIN(id) FROM "{table}" GROUP BY {other_columns})'
+        )).rowcount
+
+    duplicates = connection.execute(text(
+        f'SELECT {", ".join(keys)}, GROUP_CONCAT(id) FROM "{table}" '
+        f'WHERE {key_not_null} GROUP BY {", ".join(keys)} HAVING COUNT(*) > 1'
+    )).all()
+    if duplicates:
+        report = "\n".join(
+            f"  {tuple(row[:-1])}: id {', '.join(sorted(row[-1].split(','), key=int))}"
+            for row in duplicates
+        )
+        raise RuntimeError(f"{table}: merge duplicate rows by hand before {name}\n{report}")
+    return removed
+
+
+def model_indexes(connection: Connection) -> None:
+    """Индексы и уникальные ограничения моделей для баз, созданных до них.
+
+    Перед уникальным индексом из таблицы убираются полные копии строк,
+    иначе CREATE UNIQUE INDEX упадёт; остальные повторы останавливают миграцию.
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+
+    for table, name, columns, unique in MODEL_INDEXES:
+        if table not in existing_tables:
+            continue
+        if name in {index["name"] for index in inspector.get_indexes(table)}:
+            continue
+
+        if unique and (removed := deduplicate(connection, table, name, columns)):
+            print(f"{table}: removed {removed} exact duplicate rows before {name}")
+
+        connection.exec_driver_sql(
+            f'CREATE {"UNIQUE " if unique else ""}INDEX "{name}" ON "{table}" ({", ".join(columns)})'
+        )
+
+
+# Профили курсов 1-6 по типам из прежней цепочки условий в test_result_page.
+# Рекомендуется ближайший профиль, поэтому на границах выбор отличается от
+# цепочки: например, (6, 0) раньше давало курс 2, теперь 5
+LEGACY_SKILL_PROFILES = {
+    1: (0, 0),
+    2: (5, 5),
+    3: (3, 8),
+    4: (8, 8),
+    5: (8, 3),
+    6: (2, 5),
+}
+
+
+def course_skill_profiles(connection: Connection) -> None:
+    """Колонки профиля навыков курса для рекомендаций по результатам теста"""
+    columns = {column["name"] for column in inspect(connection).get_columns("courses")}
+    if "creative_weight" in columns:
+        return
+
+    connection.execute(text("ALTER TABLE courses ADD COLUMN creative_weight FLOAT NOT NULL DEFAULT 0"))
+    connection.execute(text("ALTER TABLE courses ADD COLUMN analytical_weight FLOAT NOT NULL DEFAULT 0"))
+    connection.execute(
+        text("UPDATE courses SET creative_weight = :creative, analytical_weight = :analytical WHERE id = :id"),
+        [
+            {"id": id, "creative": creative, "analytical": analytical}
+            for id, (creative, analytical) in LEGACY_SKILL_PROFILES.items()
+        ]
+    )
+
+
+def test_submissions(connection: Connection) -> None:
+    """Таблицы отправок теста и их агрегатов"""
+    for statement in TEST_SUBMISSION_TABLES:
+        connection.exec_driver_sql(statement)
+
+
+def catalog_versions(connection: Connection) -> None:
+    """Таблица версий справочников для кэша каталогов"""
+    for statement in CATALOG_VERSION_TABLES:
+        connection.exec_driver_sql(statement)
+
+
+def updated_at_columns(connection: Connection) -> None:
+    """updated_at у курсов и тем для ETag / Last-Modified их страниц"""
+    now = datetime.now(timezone.utc)
+    for table in ("courses", "topics"):
+        columns = {column["name"] for column in inspect(connection).get_columns(table)}
+        if "updated_at" in columns:
+            continue
+
+        # SQLite не принимает в ADD COLUMN не константный default, заполняем отдельно
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN updated_at DATETIME"))
+        connection.execute(
+            text(f"UPDATE {table} SET updated_at = :now").bindparams(bindparam("now", type_=DateTime)),
+            {"now": now}
+        )
+
+
+def avatar_variants(connection: Connection) -> None:
+    """Колонка с адресами миниатюр аватара"""
+    columns = {column["name"] for column in inspect(connection).get_columns("avatars")}
+    if "variants" in columns:
+        return
+
+    connection.execute(text("ALTER TABLE avatars ADD COLUMN variants JSON"))
+
+
+def avatar_variants_null(connection: Connection) -> None:
+    """Загрузки без вариантов записывали JSON 'null' вместо NULL"""
+    connection.execute(text("UPDATE avatars SET variants = NULL WHERE variants = 'null'"))
+
+
+MIGRATIONS = [
+    Migration(1, "initial_schema", initial_schema),
+    Migration(2, "game_records_points", game_records_points),
+    Migration(3, "model_indexes", model_indexes),
+    Migration(4, "course_skill_profiles", course_skill_profiles),
+    Migration(5, "test_submissions", test_submissions),
+    Migration(6, "catalog_versions", catalog_versions),
+    Migration(7, "updated_at_columns", updated_at_columns),
+    Migration(8, "avatar_variants", avatar_variants),
+    Migration(9, "avatar_variants_null", avatar_variants_null),
+]
@@ -6,15 +6,25 @@ from sqlalchemy import (
     Enum,
     Boolean,
     Float,
-    DateTime
+    DateTime,
+    JSON,
+    Index,
+    event,
+    update
 )
 from sqlalchemy import ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import relationship, attributes
+from datetime import datetime, timezone
 
 from database import Base
 from static import Roles, Social, CourseLvl
 
 
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class BaseModel(Base):
     __abstract__ = True
     __allow_unmapped__ = True
@@ -26,34 +36,54 @@ class BaseModel(Base):
 
 class StudentCourse(BaseModel):
     __tablename__  = "student_course"
+    __table_args__ = (
+        Index("uq_student_course", "student_id", "course_id", unique=True),
+        Index("ix_student_course_course_id", "course_id"),
+    )
     student_id = Column("student_id", Integer, ForeignKey("users.id"))
     course_id = Column("course_id", Integer, ForeignKey("courses.id"))
     date = Column("date", DateTime)
 
 class StudentTopics(BaseModel):
     __tablename__ = "student_topic"
+    __table_args__ = (
+        Index("uq_student_topic", "student_id", "topic_id", unique=True),
+        Index("ix_student_topic_topic_id", "topic_id"),
+    )
     student_id = Column("student_id", Integer, ForeignKey("users.id"))
     topic_id = Column("topic_id", Integer, ForeignKey("topics.id"))
 
 class UserAvailableFrames(BaseModel):
     __tablename__ = "user_available_frames"
+    __table_args__ = (
+        Index("uq_user_available_frames", "user_id", "frame_id", unique=True),
+    )
     user_profile_id = Column("user_id", Integer, ForeignKey("users_profiles.id"))
     frame_id = Column("frame_id", Integer, ForeignKey("frames.id"))
 
 class UserAvailableTitles(BaseModel):
     __tablename__ = "user_available_titles"
+    __table_args__ = (
+        Index("uq_user_available_titles", "user_id", "title_id", unique=True),
+    )
     user_profile_id = Column("user_id", Integer, ForeignKey("users_profiles.id"))
     title_id = Column("title_id", Integer, ForeignKey("titles.id"))
 
 
 class UserAvailableAvatars(BaseModel):
     __tablename__ = "user_available_avatars"
+    __table_args__ = (
+        Index("uq_user_available_avatars", "user_profile_id", "avatar_id", unique=True),
+    )
     user_profile_id = Column("user_profile_id", Integer, ForeignKey("users_profiles.id"))
     avatar_id = Column("avatar_id", Integer, ForeignKey("avatars.id"))
 
 
 class UserPurchases(BaseModel):
     __tablename__ = "user_purchases"
+    __table_args__ = (
+        Index("uq_user_purchases", "user_id", "item_id", unique=True),
+    )
     user_id = Column("user_id", Integer, ForeignKey("users_profiles.id"))
     item_id = Column("item_id", Integer, ForeignKey("goods.id"))
     datetime = Column("date", DateTime)
@@ -61,6 +91,9 @@ class UserPurchases(BaseModel):
 
 class CoursePurchases(BaseModel):
     __tablename__ = "course_purchases"
+    __table_args__ = (
+        Index("ix_course_purchases_user_course", "user_id", "course_id"),
+    )
     user_id = Column("user_id", Integer, ForeignKey("users_profiles.id"))
     course_id = Column("course_id", Integer, ForeignKey("courses.id"))
     
@@ -68,7 +101,7 @@ class CoursePurchases(BaseModel):
 class ProfileSocials(BaseModel):
     __tablename__ = "profile_socials"
     
-    profile_id = Column("profile_id", Integer, ForeignKey("users_profiles.id"))
+    profile_id = Column("profile_id", Integer, ForeignKey("users_profiles.id"), index=True)
     social_type = Column("social_type", Enum(Social))
     value = Column("value", String)
 
@@ -76,7 +109,7 @@ class ProfileSocials(BaseModel):
 class UserProfile(BaseModel):
     __tablename__ = "users_profiles"
     
-    user_id = Column(ForeignKey("users.id"))
+    user_id = Column(ForeignKey("users.id"), unique=True, index=True)
     user = relationship("User", back_populates="profile")
     
     about_me = Column(String)
@@ -116,24 +149,70 @@ class UserProfile(BaseModel):
 class GamificationRecord(BaseModel):
     __tablename__ = "game_records"
     
-    user_id = Column(ForeignKey("users.id"))
+    user_id = Column(ForeignKey("users.id"), unique=True, index=True)
     user = relationship("User", back_populates="gamerec")
     
     xp = Column(Integer, default=0)
     lvl = Column(Integer, default=1)
     currency = Column(Integer, default=0)
     
+    # Очки лидерборда, пересчитываются при каждом изменении xp/lvl
+    points = Column(Integer, default=0)
+    
+    @staticmethod
+    def calculate_points(lvl: int | None, xp: int | None) -> int:
+        total_xp = (lvl or 1) * 100 + (xp or 0)
+        return round(total_xp / 2.5)
+    
     def __repr__(self):
         return f"<GameRecord({self.id=}, {self.user_id=}, {self.xp=})>"
 
 
+# Индекс под ORDER BY points DESC, user_id LIMIT n
+Index(
+    "ix_game_records_leaderboard",
+    GamificationRecord.points.desc(),
+    GamificationRecord.user_id
+)
+
+
+@event.listens_for(GamificationRecord, "before_insert")
+@event.listens_for(GamificationRecord, "before_update")
+def _update_points(mapper, connection, target: GamificationRecord):
+    target.points = GamificationRecord.calculate_points(target.lvl, target.xp) # type: ignore
+
+
+def touch_game_records(connection) -> None:
+    """Версия game_records в catalog_versions: по ней процессы узнают, что их
+    индекс мест лидерборда устарел. Та же строка, что у catalog_cache.touch"""
+    stmt = sqlite_insert(CatalogVersion)
+    connection.execute(
+        stmt.on_conflict_do_update(index_elements=["name"], set_={"version": CatalogVersion.version + 1}),
+        {"name": GamificationRecord.__tablename__, "version": 1}
+    )
+
+
+@event.listens_for(GamificationRecord, "after_insert")
+@event.listens_for(GamificationRecord, "after_delete")
+def _touch_on_insert_delete(mapper, connection, target: GamificationRecord):
+    touch_game_records(connection)
+
+
+@event.listens_for(GamificationRecord, "after_update")
+def _touch_on_update(mapper, connection, target: GamificationRecord):
+    # Валюта и прочее место в лидерборде не меняют
+    if any(attributes.get_history(target, key).has_changes() for key in ("points", "user_id")):
+        touch_game_records(connection)
+
+
 class User(BaseModel):
     __tablename__ = "users"
     
-    login = Column(String)
+    # В старых базах логины повторяются, поэтому индексы без unique
+    login = Column(String, index=True)
     nickname = Column(String)
     password = Column(String)
-    email = Column(String)
+    email = Column(String, index=True)
     role = Column(Enum(Roles))
 
     profile = relationship(UserProfile,back_populates="user", uselist=False) # 1 к 1
@@ -163,9 +242,9 @@ class Frame(BaseModel):
 class Achievement(BaseModel):
     __tablename__ = "achievements"
     
-    user_id = Column(ForeignKey("users_profiles.id"))
+    user_id = Column(ForeignKey("users_profiles.id"), index=True)
     
-    name = Column(String)
+    name = Column(String, index=True)
     description = Column(String)
 
 
@@ -175,7 +254,7 @@ class Title(BaseModel):
     users_with_active_title = relationship(UserProfile, foreign_keys="[UserProfile.current_title_id]", back_populates="current_title")
     users_with_frame = relationship(UserProfile, secondary="user_available_titles", back_populates="available_titles")
     
-    name = Column(String)
+    name = Column(String, index=True)
 
 
 class Course(BaseModel):
@@ -184,7 +263,12 @@ class Course(BaseModel):
     name = Column(String)
     description = Column(String)
     price = Column(Float)
-    course_lvl = Column(Enum(CourseLvl))
+    course_lvl = Column(Enum(CourseLvl), index=True)
+    # Профиль навыков курса по шкале теста: для кого курс подходит лучше всего
+    creative_weight = Column(Float, default=0, nullable=False, server_default="0")
+    analytical_weight = Column(Float, default=0, nullable=False, server_default="0")
+    # Меняется при правке курса и его тем, от него считается ETag страницы курса
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
     users = relationship(User, secondary="student_course", back_populates="courses")
 
     topics = relationship("Topic")
@@ -196,12 +280,13 @@ class Course(BaseModel):
 class Topic(BaseModel):
     __tablename__ = "topics"
     
-    course_id = Column(ForeignKey("courses.id"))
+    course_id = Column(ForeignKey("courses.id"), index=True)
     
     
     name = Column(String)
     content = Column(String, nullable=True)
     order = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
     
     users_completed = relationship(User, secondary="student_topic", back_populates="completed_topics")
 
@@ -210,6 +295,20 @@ class Topic(BaseModel):
         return f"<Topic({self.name=},{self.users_completed=})>"
 
 
+@event.listens_for(Topic, "after_insert")
+@event.listens_for(Topic, "after_update")
+@event.listens_for(Topic, "after_delete")
+def _touch_course(mapper, connection, target: Topic):
+    """Список тем - часть страницы курса: любое изменение темы обновляет курс.
+    Если тему перенесли, обновляется и прежний курс"""
+    course_ids = {target.course_id, *attributes.get_history(target, "course_id").deleted}
+    connection.execute(
+        update(Course)
+        .where(Course.id.in_([id for id in course_ids if id is not None]))
+        .values(updated_at=utcnow())
+    )
+
+
 class TestQuestion(BaseModel):
     __tablename__ = "test_questions"
     
@@ -225,7 +324,7 @@ class TestQuestion(BaseModel):
 class TestAnswer(BaseModel):
     __tablename__ = "test_answers"
     
-    question_id = Column(ForeignKey("test_questions.id"))
+    question_id = Column(ForeignKey("test_questions.id"), index=True)
     text = Column(String)
     analytical_value = Column(Integer)
     creative_value = Column(Integer)
@@ -235,12 +334,71 @@ class TestAnswer(BaseModel):
         return f"<TestAnswer({self.id=})>"
 
 
+class CatalogVersion(BaseModel):
+    """Версия справочной таблицы: растёт при каждом её изменении, по ней
+    процессы узнают, что их кэш справочника устарел"""
+    __tablename__ = "catalog_versions"
+    __table_args__ = (
+        Index("uq_catalog_versions_name", "name", unique=True),
+    )
+    name = Column(String)
+    version = Column(Integer, default=0)
+
+
+class TestSubmission(BaseModel):
+    __tablename__ = "test_submissions"
+    
+    creative_score = Column(Integer)
+    analytical_score = Column(Integer)
+    date = Column("date", DateTime)
+    
+    answers = relationship("TestSubmissionAnswer", back_populates="submission")
+
+
+    def __repr__(self):
+        return f"<TestSubmission({self.id=})>"
+
+
+class TestSubmissionAnswer(BaseModel):
+    __tablename__ = "test_submission_answers"
+    
+    submission_id = Column(ForeignKey("test_submissions.id"), index=True)
+    question_id = Column(Integer)
+    answer_id = Column(Integer)
+    
+    submission = relationship(TestSubmission, back_populates="answers")
+
+
+class TestAnswerPicks(BaseModel):
+    """Сколько раз выбирали ответ, обновляется вместе с записью отправок"""
+    __tablename__ = "test_answer_picks"
+    __table_args__ = (
+        Index("uq_test_answer_picks", "answer_id", unique=True),
+    )
+    answer_id = Column(Integer)
+    picks = Column(Integer, default=0)
+
+
+class TestScoreHistogram(BaseModel):
+    """Число отправок с данным баллом по оси creative/analytical"""
+    __tablename__ = "test_score_histogram"
+    __table_args__ = (
+        Index("uq_test_score_histogram", "axis", "score", unique=True),
+    )
+    axis = Column(String)
+    score = Column(Integer)
+    count = Column(Integer, default=0)
+
+
 class Avatar(BaseModel):
     __tablename__ = "avatars"
     
     name = Column(String)
     image_url = Column(String)
     is_public = Column(Boolean, default=True)
+    # {"avif": [[ширина, url], ...], "webp": [...]}; None - ещё не обработан.
+    # none_as_null: None пишется как SQL NULL, а не JSON 'null', иначе его не найдёт is_(None)
+    variants = Column(JSON(none_as_null=True), nullable=True)
     
     users_with_active_avatar = relationship(
         "UserProfile", 
@@ -254,6 +412,11 @@ class Avatar(BaseModel):
         back_populates="available_avatars"
     )
 
+    @property
+    def url(self) -> str:
+        """Адрес оригинала для браузера: в image_url путь от корня проекта"""
+        return self.image_url.replace("\\", "/").removeprefix("/web")
+
     def __repr__(self):
         return f"<Avatar({self.id=}, {self.name=})>"
     
@@ -261,6 +424,6 @@ class Avatar(BaseModel):
 class Goods(BaseModel):
     __tablename__ = "goods"
     
-    name = Column(String)
+    name = Column(String, index=True)
     
     users = relationship(UserProfile, secondary="user_purchases", back_populates="purchases")
\ No newline at end of file
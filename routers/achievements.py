@@ -10,6 +10,7 @@ from templates import templates
 from models import Achievement
 from schemas.achievements import AchievementResponse, AchievementCreate
 from utils.db_helpher import get_db
+from utils.catalog_cache import catalog_cache
 
 
 
@@ -33,6 +34,7 @@ def create_achievement(
     )
     
     db.add(db_achievement)
+    catalog_cache.touch(db, Achievement)
     db.commit()
     db.refresh(db_achievement)
     
@@ -41,7 +43,7 @@ def create_achievement(
 
 @router.get("/")
 def get_achievements(db: Session = Depends(get_db)):
-    return db.query(Achievement).all()
+    return catalog_cache.get(db, Achievement)
 
 
 @router.get("/view")
@@ -70,6 +72,7 @@ def update_achievement(achievement_id: int, achievement: AchievementCreate, db:
     db_achievement.name = achievement.name # type: ignore
     db_achievement.description = achievement.description # type: ignore
     
+    catalog_cache.touch(db, Achievement)
     db.commit()
     db.refresh(db_achievement)
     return db_achievement
@@ -82,5 +85,6 @@ def delete_achievement(achievement_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Achievement not found")
     
     db.delete(achievement)
+    catalog_cache.touch(db, Achievement)
     db.commit()
     return {"message": "Achievement deleted successfully"}
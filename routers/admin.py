@@ -1,19 +1,32 @@
 from fastapi import (
+    HTTPException,
     Depends,
     Request,
-    APIRouter
+    APIRouter,
+    Query
 )
-from sqlalchemy.orm import Session, joinedload
-from templates import templates
+from typing import Literal
+from sqlalchemy.orm import Session, selectinload
+from templates import templates, bytecode_cache, startup_report
 
 from models import (
-    User,
     Title, 
     Achievement,
     Course,
     TestQuestion
     )
 from utils.db_helpher import get_db
+from auth.principal_cache import principal_cache
+from auth.utils_jwt import verified_tokens
+from utils.test_stats import submission_writer, load_stats
+from utils.catalog_cache import catalog_cache
+from utils.page_cache import page_cache
+from utils.fragment_cache import fragment_cache
+from utils.scoring import scoring_index
+from utils.rank_index import rank_index
+from utils import user_grid
+from static import Roles
+from media.pipeline import avatar_pipeline
 
 
 router = APIRouter(prefix="/admin", tags=["Admins"])
@@ -30,11 +43,14 @@ def admin_panel(request: Request):
 @router.get("/manage/test/")
 def manage_test_questions_page(request: Request, db: Session = Depends(get_db)):
     """Страница управления вопросами теста"""
-    questions = db.query(TestQuestion).order_by(TestQuestion.order).all()
+    questions = db.query(TestQuestion).options(selectinload(TestQuestion.answers)).order_by(TestQuestion.order).all()
+    # Дописываем накопленные отправки, чтобы статистика была актуальной;
+    # при ошибке записи покажем статистику без них
+    submission_writer.try_flush(db)
     return templates.TemplateResponse(
         request=request,
         name="manage_test.html",
-        context={"request": request, "questions": questions}
+        context={"request": request, "questions": questions, "stats": load_stats(db)}
     )
 
 
@@ -42,7 +58,7 @@ def manage_test_questions_page(request: Request, db: Session = Depends(get_db)):
 @router.get("/manage/titles/")
 def manage_titles_page(request: Request, db: Session = Depends(get_db)):
     """Страница управления титулами"""
-    titles = db.query(Title).all()
+    titles = catalog_cache.get(db, Title)
     return templates.TemplateResponse(
         request=request,
         name="manage_titles.html",
@@ -56,7 +72,7 @@ def manage_titles_page(request: Request, db: Session = Depends(get_db)):
 @router.get("/manage/achievements/")
 def manage_achievements_page(request: Request, db: Session = Depends(get_db)):
     """Страница управления ачивками"""
-    achievements = db.query(Achievement).all()
+    achievements = catalog_cache.get(db, Achievement)
     return templates.TemplateResponse(
         request=request,
         name="manage_achievements.html",
@@ -68,7 +84,7 @@ def manage_achievements_page(request: Request, db: Session = Depends(get_db)):
 @router.get("/manage/courses/")
 def manage_courses_page(request: Request, db: Session = Depends(get_db)):
     """Страница управления курсами и темами"""
-    courses = db.query(Course).options(joinedload(Course.topics)).all()
+    courses = catalog_cache.get(db, Course)
     return templates.TemplateResponse(
         request=request,
         name="manage_courses.html",
@@ -79,25 +95,112 @@ def manage_courses_page(request: Request, db: Session = Depends(get_db)):
 
 
 @router.get("/manage/users/")
-def manage_users_page(request: Request, db: Session = Depends(get_db)):
-    """Страница управления пользователями"""
-    users = db.query(User).options(
-        joinedload(User.title),
-        joinedload(User.achievements),
-    ).all()
-    titles = db.query(Title).all()
-    achievements = db.query(Achievement).all()
-    courses = db.query(Course).all()
+def manage_users_page(
+    request: Request,
+    q: str | None = None,
+    # Строки: "Все" в форме фильтров отправляет пустое значение
+    role: str | None = None,
+    title_id: str | None = None,
+    sort: user_grid.Sort = "id",
+    order: Literal["asc", "desc"] = "asc",
+    page: int = Query(1, ge=1),
+    page_size: int = Query(user_grid.PAGE_SIZE, ge=1, le=user_grid.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Страница управления пользователями: поиск, фильтры и сортировка на стороне базы"""
+    try:
+        role_filter = Roles(role) if role else None
+        title_filter = int(title_id) if title_id else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid role or title_id")
+
+    grid = user_grid.get_page(db, q, role_filter, title_filter, sort, order == "desc", page, page_size)
+    titles = catalog_cache.get(db, Title)
+    achievements = catalog_cache.get(db, Achievement)
+    courses = catalog_cache.get(db, Course)
+
+    # Текущие фильтры для ссылок пагинации и сортировки
+    params = {
+        name: value for name, value in {
+            "q": q,
+            "role": role_filter.value if role_filter else None,
+            "title_id": title_filter,
+            "sort": sort,
+            "order": order,
+            "page_size": page_size
+        }.items()
+        if value is not None
+    }
     
     return templates.TemplateResponse(
         request=request,
         name="manage_users.html",
         context={
             "request": request, 
-            "users": users, 
+            "users": grid["items"],
+            "grid": grid,
+            "params": params,
+            "roles": list(Roles),
             "titles": titles, 
             "achievements": achievements, 
             "courses": courses
         }
     )
 
+
+@router.get("/cache/principals")
+def principal_cache_stats():
+    """Счётчики кэша авторизованных пользователей"""
+    return principal_cache.stats()
+
+
+@router.get("/cache/tokens")
+def verified_tokens_cache_stats():
+    """Счётчики кэша проверенных JWT"""
+    return verified_tokens.stats()
+
+
+@router.get("/cache/catalog")
+def catalog_cache_stats():
+    """Версии и счётчики кэша справочников"""
+    return catalog_cache.stats()
+
+
+@router.get("/cache/pages")
+def page_cache_stats():
+    """Счётчики кэша статичных страниц"""
+    return page_cache.stats()
+
+
+@router.get("/cache/fragments")
+def fragment_cache_stats():
+    """Возраст фрагментов главной и счётчики их кэша"""
+    return fragment_cache.stats()
+
+
+@router.get("/cache/scoring")
+def scoring_index_stats():
+    """Версия индекса баллов теста в этом воркере и число его загрузок"""
+    return scoring_index.stats()
+
+
+@router.get("/cache/ranks")
+def rank_index_stats():
+    """Индексы мест лидерборда этого воркера: версии, перечитывания и применённые изменения"""
+    return rank_index.stats()
+
+
+@router.get("/avatars/pipeline")
+def avatar_pipeline_stats():
+    """Счётчики фоновой обработки аватаров"""
+    return avatar_pipeline.stats()
+
+
+@router.get("/templates/startup")
+def templates_startup_report():
+    """Время загрузки каждого шаблона при старте и попадания в кэш байткода"""
+    return {
+        "templates": [timing._asdict() for timing in startup_report],
+        "total_ms": sum(timing.milliseconds for timing in startup_report),
+        "bytecode_cache": {"hits": bytecode_cache.hits, "misses": bytecode_cache.misses} if bytecode_cache else None,
+    }
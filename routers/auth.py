@@ -10,7 +10,8 @@ from sqlalchemy.exc import IntegrityError
 from models import User, UserProfile, GamificationRecord
 from schemas.users import (
     UserRegisterSchema,
-    User as UserSchema
+    User as UserSchema,
+    Principal
 )
 
 from schemas.other import Response as ResponseSchema, Token
@@ -18,7 +19,7 @@ from static import Roles
 
 
 from utils.helpers import create_access_token, create_refresh_token
-from validation import get_current_auth_user_for_refresh
+from validation import get_current_principal_for_refresh
 from utils.db_helpher import get_db
 from utils.functions import get_hash
 from utils.helpers import validate_auth_user
@@ -28,6 +29,7 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 
 @router.post("/login/", response_model=Token)
 def auth_user(response: Response, user: UserSchema = Depends(validate_auth_user)):
+    """Синхронный: подпись RS256 тяжёлая и идёт в пуле потоков, не в цикле событий"""
 
     access_token = create_access_token(user)
     refresh_token = create_refresh_token(user)
@@ -39,7 +41,7 @@ def auth_user(response: Response, user: UserSchema = Depends(validate_auth_user)
 
 @router.post("/refresh/", response_model=Token, response_model_exclude_none=True)
 def auth_refresh_jwt(
-    user: UserSchema = Depends(get_current_auth_user_for_refresh)
+    user: Principal = Depends(get_current_principal_for_refresh)
 ):
     access_token = create_access_token(user)
     return Token(
@@ -4,21 +4,22 @@ from fastapi import (
     APIRouter,
     Form,
     UploadFile,
-    File
+    File,
+    BackgroundTasks
 )
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 
 from models import Avatar
 
-import os
-import uuid
-from pathlib import Path
-
 
 from utils.db_helpher import get_db
-
-AVATARS_DIR = Path("web/static/img/avatars")
+from utils.catalog_cache import catalog_cache
+from utils.uploads import store_image
+from media.pipeline import avatar_pipeline
+from media.storage import AVATARS_DIR, stored_url
 
 router = APIRouter(prefix="/avatars", tags=["Avatars"])
 
@@ -26,46 +27,44 @@ MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
 @router.post("/")
 async def create_avatar(
+    background_tasks: BackgroundTasks,
     name: str = Form(...),
     is_public: bool = Form(True),
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
     ):
 
-    if not file.content_type.startswith('image/'): #type: ignore
-        raise HTTPException(status_code=400, detail="File must be an image")
-
-    if file.content_type.startswith('image/gif'): #type: ignore
-        raise HTTPException(status_code=400, detail="File must be an image")
-    
-    file_extension = file.filename.split('.')[-1] #type: ignore
-    filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = os.path.join(AVATARS_DIR, filename)
-    
-    
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File too large")
-    
+    # Загрузка уже лежит во временном файле: копируем её кусками в потоке,
+    # не занимая event loop и не читая файл в память целиком
     try:
-        with open(file_path, 'wb') as f:
-            f.write(contents)
-    except Exception as e:
+        file_path = await run_in_threadpool(store_image, file.file, AVATARS_DIR, MAX_FILE_SIZE)
+    except OSError as e:
         raise HTTPException(status_code=500, detail=f"Could not save file: {str(e)}")
     finally:
         await file.close()
-        
+
     # Создаем URL для доступа к файлу
-    image_url = f"/{AVATARS_DIR}/{filename}"
+    image_url = stored_url(file_path)
+
+    # Такая картинка уже загружалась: файл общий, миниатюры к нему уже есть
+    duplicate = db.scalar(
+        select(Avatar).where(Avatar.image_url == image_url, Avatar.variants.is_not(None)).limit(1)
+    )
     
     db_avatar = Avatar(
         name=name,
         image_url=image_url,
         is_public=is_public
     )
+    if duplicate:
+        db_avatar.variants = duplicate.variants
     
     db.add(db_avatar)
+    catalog_cache.touch(db, Avatar)
     db.commit()
     db.refresh(db_avatar)
+    # Миниатюры считаются после ответа, до них страницы показывают оригинал
+    if db_avatar.variants is None:
+        background_tasks.add_task(avatar_pipeline.process, db_avatar.id, image_url)
     
     return db_avatar
\ No newline at end of file
@@ -1,13 +1,20 @@
+from typing import Callable
+
 from fastapi import (
-    Depends,
+    BackgroundTasks,
+    HTTPException,
     Request,
     APIRouter
 )
-from sqlalchemy.orm import Session
-
-from templates import templates
-from utils.db_helpher import get_db
-from utils.helpers import get_leaderboard
+from fastapi.responses import HTMLResponse
+from fastapi.concurrency import run_in_threadpool
+
+from templates import templates, render_partial, PARTIALS
+from database import session_local
+from utils import leaderboard
+from utils.fragment_cache import fragment_cache
+from utils.catalog_cache import catalog_cache
+from utils.page_cache import cached_page
 from models import Course
 from static import CourseLvl
 
@@ -16,28 +23,72 @@ from static import CourseLvl
 
 router = APIRouter()
 
+
+# Сколько секунд фрагмент главной отдаётся без обновления
+LEADERS_MAX_AGE = 30
+COURSES_MAX_AGE = 300
+
+
+def courses_by_lvl(courses: list[Course], course_lvl: CourseLvl, limit: int = 3) -> list[Course]:
+    return [course for course in courses if course.course_lvl == course_lvl][:limit]
+
+
+def render_leaders() -> str:
+    with session_local() as db:
+        leaders = leaderboard.get_top(db)
+    return templates.get_template("fragments/index_leaders.html").render(leaders=leaders)
+
+
+def render_courses(course_lvl: CourseLvl) -> Callable[[], str]:
+    def render() -> str:
+        with session_local() as db:
+            courses = courses_by_lvl(catalog_cache.get(db, Course), course_lvl)
+        return templates.get_template("fragments/index_courses.html").render(courses=courses)
+    return render
+
+
+def catalog_versions(models: set) -> dict:
+    with session_local() as db:
+        return {model: catalog_cache.version(db, model.__tablename__) for model in models}
+
+
+# Ключ: (перерисовка, срок жизни, справочник, при изменении которого фрагмент устаревает сразу)
+INDEX_FRAGMENTS = {
+    "leaders": (render_leaders, LEADERS_MAX_AGE, None),
+    "beginners_courses": (render_courses(CourseLvl.BEGGINER), COURSES_MAX_AGE, Course),
+    "pro_courses": (render_courses(CourseLvl.PRO), COURSES_MAX_AGE, Course),
+}
+
+
 @router.get("/", name="index")
-def index_page(
-    request: Request,
-    leaders = Depends(get_leaderboard),
-    db: Session = Depends(get_db)
-):
-    
-    beginers_courses = db.query(Course).where(Course.course_lvl == CourseLvl.BEGGINER).limit(3)
-    pro_courses = db.query(Course).where(Course.course_lvl == CourseLvl.PRO).limit(3)
-    
-    
+async def index_page(request: Request, background_tasks: BackgroundTasks):
+    """Главная из готовых фрагментов: кроме версий справочников база
+    читается только при их перерисовке"""
+    versions = await run_in_threadpool(
+        catalog_versions, {catalog for _, _, catalog in INDEX_FRAGMENTS.values() if catalog is not None}
+    )
+    fragments = {}
+    for key, (render, max_age, catalog) in INDEX_FRAGMENTS.items():
+        version = versions.get(catalog)
+        html, refresh = fragment_cache.lookup(key, max_age, version)
+        if html is None:
+            html = await run_in_threadpool(fragment_cache.refresh, key, render, version)
+        elif refresh:
+            # Отдаём устаревший фрагмент сейчас, новый будет после ответа
+            background_tasks.add_task(fragment_cache.refresh, key, render, version)
+        fragments[key] = html
     
     return templates.TemplateResponse(
         request=request,
         name="index.html",
-        context={"request": request, "leaders": leaders, "beginners_courses" : beginers_courses, "pro_courses" : pro_courses})
+        context={"request": request, **fragments})
  
 
 
 
 
 @router.get("/help", name="help")
+@cached_page
 def get_help(request: Request):
     
     return templates.TemplateResponse(
@@ -48,6 +99,7 @@ def get_help(request: Request):
 
 
 @router.get("/partners", name="partners")
+@cached_page
 def partners(request: Request):
     
     return templates.TemplateResponse(
@@ -57,6 +109,7 @@ def partners(request: Request):
 
 
 @router.get("/vacancies", name="vacancies")
+@cached_page
 def vacancies(request: Request):
     
     return templates.TemplateResponse(
@@ -66,6 +119,7 @@ def vacancies(request: Request):
 
 
 @router.get("/team", name="team")
+@cached_page
 def team(request: Request):
     
     return templates.TemplateResponse(
@@ -75,6 +129,7 @@ def team(request: Request):
 
 
 @router.get("/contacts", name="contacts")
+@cached_page
 def contanct(request: Request):
     return templates.TemplateResponse(
         request=request,
@@ -82,4 +137,9 @@ def contanct(request: Request):
         context={"request": request})
 
 
-
+@router.get("/partials/{name}", name="partial", response_class=HTMLResponse)
+def partial(name: str, request: Request):
+    """Шапка или подвал для запасной загрузки из templateLoader.js"""
+    if name not in PARTIALS:
+        raise HTTPException(status_code=404)
+    return HTMLResponse(render_partial(request, name), headers={"Cache-Control": "private, no-cache", "Vary": "Accept-Language, Cookie"})
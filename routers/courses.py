@@ -2,20 +2,26 @@ from fastapi import (
     HTTPException,
     Depends,
     Request,
+    Response,
     APIRouter
 )   
-from sqlalchemy.orm import Session, joinedload, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 
 from templates import templates
 from models import Course, Topic, User
 from schemas.courses import CourseResponse, CourseCreate
-from routers.users import get_users
+from routers.users import get_users_with
+from auth.principal_cache import principal_cache
 from schemas.topics import TopicResponse
-from validation import get_current_auth_user, get_current_token_payload
+from validation import get_current_auth_user, get_current_token_payload, get_principal_by_token
 
-from utils.db_helpher import get_db
+from utils.db_helpher import get_db, get_async_db
+from utils.catalog_cache import catalog_cache
+from utils.page_cache import make_etag, conditional_headers, not_modified, header_variant, is_authenticated, HEADER_VARY
 
 
 
@@ -29,9 +35,12 @@ def create_course(course: CourseCreate, db: Session = Depends(get_db)):
         name=course.name,
         description=course.description,
         price=course.price,
-        course_lvl=course.course_lvl
+        course_lvl=course.course_lvl,
+        creative_weight=course.creative_weight,
+        analytical_weight=course.analytical_weight
     )
     db.add(db_course)
+    catalog_cache.touch(db, Course)
     db.commit()
     db.refresh(db_course)
     return db_course
@@ -60,33 +69,43 @@ def buy_courses(course_id: int, request: Request, courses: Query = Depends(get_c
 
 
 @router.get("/", name="courses")
-def get_courses(request: Request, users: Query = Depends(get_users), courses: Query = Depends(get_courses_query) ):
+async def get_courses(request: Request, db: AsyncSession = Depends(get_async_db)):
     
     available_courses = []
+    courses = (await db.scalars(select(Course).options(selectinload(Course.topics)))).all()
     
     if token:= request.cookies.get("access_token"):
-        payload = get_current_token_payload(token)
-        user: User = get_current_auth_user(payload, users)
-        available_courses.extend(user.courses)
-    
+        principal = await get_principal_by_token(token, db)
+        available_courses.extend(c for c in courses if c.id in principal.course_ids)
      
     return templates.TemplateResponse(
         request=request,
         name="courses.html",
-        context={"request": request, "courses":courses.all(), "available_courses":available_courses})
+        context={"request": request, "courses":courses, "available_courses":available_courses})
 
 
 
 @router.get("/{course_id}", response_model=CourseResponse, name="course")
 def get_course(course_id: int,  request: Request, db: Session = Depends(get_db)):
-    course = db.query(Course).options(joinedload(Course.topics)).filter(Course.id == course_id).first()
+    # Курс с темами из кэша каталога, в базу - только проверка его версии
+    course = next((c for c in catalog_cache.get(db, Course) if c.id == course_id), None)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     
+    # updated_at курса меняется и при правке его тем. Шапка зависит от языка и входа:
+    # они в ETag, а Last-Modified их не отражает, поэтому вошедшим его не отдаём
+    authenticated = is_authenticated(request)
+    etag = make_etag("course", course.id, course.updated_at, *header_variant(request))
+    last_modified = None if authenticated else course.updated_at
+    headers = conditional_headers(etag, last_modified, private=True, vary=HEADER_VARY) # type: ignore
+    if not_modified(request, etag, last_modified): # type: ignore
+        return Response(status_code=304, headers=headers)
+    
     return templates.TemplateResponse(
         request=request,
         name="cours.html",
-        context={"request": request, "course": course})
+        context={"request": request, "course": course},
+        headers=headers)
     
 
 
@@ -98,6 +117,7 @@ def delete_course(course_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Course not found")
     
     db.delete(course)
+    catalog_cache.touch(db, Course)
     db.commit()
     return {"message": "Course deleted successfully"}
 
@@ -111,7 +131,10 @@ def update_course(course_id: int, course: CourseCreate, db: Session = Depends(ge
     
     db_course.name = course.name # type: ignore
     db_course.description = course.description #type: ignore
+    db_course.creative_weight = course.creative_weight # type: ignore
+    db_course.analytical_weight = course.analytical_weight # type: ignore
     
+    catalog_cache.touch(db, Course)
     db.commit()
     db.refresh(db_course)
     return db_course
@@ -119,7 +142,7 @@ def update_course(course_id: int, course: CourseCreate, db: Session = Depends(ge
 
 
 @router.post("/grant_course/{course_id}")
-def grant_course(course_id: int,  request: Request,db: Session = Depends(get_db), users: Query = Depends(get_users)):
+def grant_course(course_id: int,  request: Request,db: Session = Depends(get_db), users: Query = Depends(get_users_with("progress"))):
     if token:= request.cookies.get("access_token"):
         payload = get_current_token_payload(token)
         user: User = get_current_auth_user(payload, users)
@@ -129,11 +152,13 @@ def grant_course(course_id: int,  request: Request,db: Session = Depends(get_db)
         if not course:
             raise HTTPException(status_code=404)
         
-        user.courses.append(course)
+        if course not in user.courses:
+            user.courses.append(course)
         
         db.add(user)
         db.commit()
         db.refresh(user)
+        principal_cache.invalidate(user.id)
         
         print(f"Пользователь {user.nickname} получил курс с {course.name}")
         
@@ -13,6 +13,7 @@ from models import Goods
 from schemas.goods import GoodsCreate, GoodsResponse
 
 from utils.db_helpher import get_db
+from utils.catalog_cache import catalog_cache
 
 
 
@@ -28,6 +29,7 @@ def createItem(item: GoodsCreate,db: Session = Depends(get_db)):
     
     db_item = Goods(name=item.name)
     db.add(db_item)
+    catalog_cache.touch(db, Goods)
     db.commit()
     db.refresh(db_item)
     
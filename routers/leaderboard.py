@@ -0,0 +1,25 @@
+from fastapi import (
+    Depends,
+    APIRouter,
+    Query
+)
+from sqlalchemy.orm import Session
+
+from schemas.gamification import LeaderboardPage
+from utils.db_helpher import get_db
+from utils import leaderboard
+
+
+router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
+
+
+@router.get("/", response_model=LeaderboardPage)
+def get_leaderboard_page(
+    after_points: int | None = None,
+    after_user_id: int | None = None,
+    after_position: int | None = Query(None, ge=0),
+    limit: int = Query(leaderboard.LEADERBOARD_SIZE, ge=1, le=leaderboard.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Лидерборд постранично: следующая страница запрашивается по полю next"""
+    return leaderboard.get_page(db, after_points, after_user_id, limit, after_position)
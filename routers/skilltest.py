@@ -5,6 +5,7 @@ from fastapi import (
     APIRouter
 )
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from templates import templates
 
@@ -27,7 +28,11 @@ from schemas.testing import (
 
 
 
-from utils.db_helpher import get_db
+from utils.db_helpher import get_db, get_async_db
+from utils.scoring import scoring_index, InvalidAnswer
+from utils.recommendations import course_recommender
+from utils.catalog_cache import catalog_cache
+from utils.test_stats import submission_writer
 
 
 router = APIRouter(prefix="/test", tags=["Test"])
@@ -42,27 +47,23 @@ def get_test_questions(db: Session = Depends(get_db)):
     return questions
 
 @router.post("/submit", response_model=TestRecommendationResponse)
-def submit_test_answers(
+async def submit_test_answers(
     submission: TestSubmissionSchema,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Обработать ответы теста и вернуть рекомендацию"""
-    creative_total = 0
-    analytical_total = 0
-    
-    # Получаем все ответы из базы для проверки
-    all_answers = {}
-    for answer in db.query(TestAnswer).all():
-        all_answers[answer.id] = {
-            "creative": answer.creative_value,
-            "analytical": answer.analytical_value
-        }
+    # Баллы ответов лежат в памяти, из базы читается только версия ответов
+    index = await db.run_sync(scoring_index.get)
     
-    # Суммируем баллы за выбранные ответы
-    for answer in submission.answers:
-        if answer.answer_id in all_answers:
-            creative_total += all_answers[answer.answer_id]["creative"]
-            analytical_total += all_answers[answer.answer_id]["analytical"]
+    answers = [(answer.question_id, answer.answer_id) for answer in submission.answers]
+    try:
+        creative_total, analytical_total = index.score(answers)
+    except InvalidAnswer as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Отправки пишутся пачками, запрос платит за запись только когда пачка набралась
+    if submission_writer.add(creative_total, analytical_total, answers):
+        await db.run_sync(submission_writer.try_flush)
     
     # Определяем рекомендованный курс
     if creative_total >= 5:
@@ -143,6 +144,7 @@ def delete_question(question_id: int, db: Session = Depends(get_db)):
     db.query(TestAnswer).filter(TestAnswer.question_id == question_id).delete()
     
     db.delete(question)
+    catalog_cache.touch(db, TestAnswer)
     db.commit()
     return {"message": "Question deleted successfully"}
 
@@ -161,6 +163,7 @@ def create_answer_option(answer: TestAnswerCreate, db: Session = Depends(get_db)
         analytical_value=answer.analytical_value
     )
     db.add(db_answer)
+    catalog_cache.touch(db, TestAnswer)
     db.commit()
     db.refresh(db_answer)
     return db_answer
@@ -185,6 +188,7 @@ def update_answer_option(answer_id: int, answer_data: TestAnswerUpdate, db: Sess
     db_answer.creative_value = answer_data.creative_value #type: ignore
     db_answer.analytical_value = answer_data.analytical_value #type: ignore
     
+    catalog_cache.touch(db, TestAnswer)
     db.commit()
     db.refresh(db_answer)
     return db_answer
@@ -196,6 +200,7 @@ def delete_answer_option(answer_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Answer option not found")
     
     db.delete(answer)
+    catalog_cache.touch(db, TestAnswer)
     db.commit()
     return {"message": "Answer option deleted successfully"}
 
@@ -208,38 +213,15 @@ def test_result_page(
     db: Session = Depends(get_db)
 ):
     """Страница с результатами теста"""
-    # Получаем все курсы из базы данных
-    all_courses = db.query(Course).all()
-    
-    # Детерминированная логика выбора курса на основе баллов
-    if creative_score >= 7 and analytical_score >= 7:
-        # Универсальный талант - курс полного цикла
-        recommended_course = db.query(Course).filter(Course.id == 4).first()  
-    elif creative_score >= 7:
-        # Творческий тип - фронтенд или дизайн
-        recommended_course = db.query(Course).filter(Course.id == 5).first()  
-    elif analytical_score >= 7:
-        # Аналитический тип - бэкенд или данные
-         recommended_course = db.query(Course).filter(Course.id == 3).first()  
-    elif creative_score >= 5 and analytical_score >= 5:
-        # Сбалансированный профиль - универсальный курс
-        recommended_course = db.query(Course).filter(Course.id == 2).first()  
-    elif creative_score > analytical_score:
-        # Склонность к творчеству
-        recommended_course = db.query(Course).filter(Course.id == 2).first()  
-    elif analytical_score > creative_score:
-        # Склонность к аналитике
-        recommended_course = db.query(Course).filter(Course.id == 6).first()  
-    else:
-        # Нейтральный результат - базовый курс
-        recommended_course = db.query(Course).filter(Course.id == 1).first()  
-    
-    
-    recommended_course = db.query(Course).filter(Course.id == 1).first()   # Формируем список других курсов (исключая рекомендованный)
-    other_courses = [c for c in all_courses if c.id != recommended_course.id] #type: ignore
-    
-    # Ограничиваем количество отображаемых курсов до 3
-    other_courses = other_courses[:3]
+    # Курсы и матрица профилей пересобираются только при смене версии каталога
+    catalog = catalog_cache.get_entry(db, Course)
+    recommended_id, other_ids = course_recommender.get(catalog).recommend(creative_score, analytical_score)
+    if recommended_id is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    courses_by_id = {course.id: course for course in catalog.items}
+    recommended_course = courses_by_id[recommended_id]
+    other_courses = [courses_by_id[id] for id in other_ids]
     
     return templates.TemplateResponse(
         request=request,
@@ -10,6 +10,7 @@ from typing import List
 from models import Title
 from schemas.titles import TitleCreate, TitleResponse
 from utils.db_helpher import get_db
+from utils.catalog_cache import catalog_cache
 
 
 router = APIRouter(prefix="/titles", tags=["Titles"])
@@ -24,6 +25,7 @@ def create_title(title: TitleCreate, db: Session = Depends(get_db)):
     
     db_title = Title(name=title.name)
     db.add(db_title)
+    catalog_cache.touch(db, Title)
     db.commit()
     db.refresh(db_title)
     return db_title
@@ -32,8 +34,7 @@ def create_title(title: TitleCreate, db: Session = Depends(get_db)):
 @router.get("/", response_model=List[TitleResponse])
 def get_all_titles(db: Session = Depends(get_db)):
     """Получить все титулы"""
-    titles = db.query(Title).all()
-    return titles
+    return catalog_cache.get(db, Title)
 
 
 @router.get("/{title_id}", response_model=TitleResponse)
@@ -56,6 +57,7 @@ def update_title(title_id: int, title: TitleCreate, db: Session = Depends(get_db
         raise HTTPException(status_code=400, detail="Title with this name already exists")
     
     db_title.name = title.name  # type: ignore
+    catalog_cache.touch(db, Title)
     db.commit()
     db.refresh(db_title)
     return db_title
@@ -68,5 +70,6 @@ def delete_title(title_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Title not found")
     
     db.delete(title)
+    catalog_cache.touch(db, Title)
     db.commit()
     return {"message": "Title deleted successfully"}
@@ -3,18 +3,24 @@ from fastapi import (
     Depends,
     status,
     Request,
+    Response,
     APIRouter,
 )
+from sqlalchemy import select
 from sqlalchemy.orm import Session, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from templates import templates
 
 
 from models import Course, Topic, User
 
 from schemas.topics import TopicResponse, TopicCreate, SaveTCompetendTopic
-from utils.db_helpher import get_db
-from routers.users import get_users
-from validation import get_current_token_payload, get_current_auth_user
+from utils.db_helpher import get_db, get_async_db
+from utils.catalog_cache import catalog_cache
+from utils.page_cache import make_etag, conditional_headers, not_modified, header_variant, HEADER_VARY
+from routers.users import get_users_with
+from auth.principal_cache import principal_cache
+from validation import get_current_token_payload, get_current_auth_user, get_principal_by_token
 
 
 router = APIRouter(prefix="/topics", tags=["Topics"])
@@ -35,6 +41,7 @@ def create_topic(topic: TopicCreate, db: Session = Depends(get_db)):
         order=topic.order
     )
     db.add(db_topic)
+    catalog_cache.touch(db, Course)
     db.commit()
     db.refresh(db_topic)
     return db_topic
@@ -42,25 +49,35 @@ def create_topic(topic: TopicCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{topic_id}", response_model=TopicResponse)
-def get_topic(topic_id: int,request: Request, db: Session = Depends(get_db), users: Query = Depends(get_users)):
-    topic = db.query(Topic).filter(Topic.id == topic_id).first()
-    if not topic:
+async def get_topic(topic_id: int,request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Сначала только версия темы: на 304 текст темы не читается и шаблон не рендерится
+    row = (await db.execute(select(Topic.updated_at).where(Topic.id == topic_id))).first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Topic not found")
+    updated_at = row.updated_at
 
     is_completed = False
 
     if token := request.cookies.get("access_token"):
-        payload = get_current_token_payload(token)
-        user: User = get_current_auth_user(payload, users)
+        principal = await get_principal_by_token(token, db)
         
-        if topic in user.completed_topics:
+        if topic_id in principal.completed_topic_ids:
             is_completed = True
     
+    # Отметка о прохождении своя у каждого пользователя, шапка - у языка и входа: всё это
+    # в ETag, а Last-Modified этого не отражает, поэтому для вошедших его не отдаём
+    etag = make_etag("topic", topic_id, updated_at, is_completed, *header_variant(request))
+    headers = conditional_headers(etag, None if token else updated_at, private=True, vary=HEADER_VARY)
+    if not_modified(request, etag, None if token else updated_at):
+        return Response(status_code=304, headers=headers)
+
+    topic = await db.get(Topic, topic_id)
 
     return templates.TemplateResponse(
         request=request,
         name="topic.html",
-        context={"request": request, "topic": topic, "is_completed": is_completed})
+        context={"request": request, "topic": topic, "is_completed": is_completed},
+        headers=headers)
 
 
 @router.put("/{topic_id}", response_model=TopicResponse)
@@ -76,10 +93,11 @@ def update_topic(topic_id: int, topic: TopicCreate, db: Session = Depends(get_db
             raise HTTPException(status_code=404, detail="Course not found")
     
     db_topic.course_id = topic.course_id  # type: ignore
-    db_topic.title = topic.title  # type: ignore
+    db_topic.name = topic.name  # type: ignore
     db_topic.content = topic.content  # type: ignore
     db_topic.order = topic.order  # type: ignore
     
+    catalog_cache.touch(db, Course)
     db.commit()
     db.refresh(db_topic)
     return db_topic
@@ -92,6 +110,7 @@ def delete_topic(topic_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Topic not found")
     
     db.delete(topic)
+    catalog_cache.touch(db, Course)
     db.commit()
     return {"message": "Topic deleted successfully"}
 
@@ -123,7 +142,7 @@ def topic(topic_id: int, request: Request, db: Session = Depends(get_db)):
 def complete_topic(
     topicToSave: SaveTCompetendTopic,
     db : Session = Depends(get_db),
-    users: Query = Depends(get_users)
+    users: Query = Depends(get_users_with("progress"))
     ):
     user: User = users.where(User.id == topicToSave.user_id).first() #type: ignore
     topic = db.query(Topic).where(Topic.id == topicToSave.topic_id).first()
@@ -134,10 +153,12 @@ def complete_topic(
     if not topic:
         raise Exception
     
-    user.completed_topics.append(topic)
+    if topic not in user.completed_topics:
+        user.completed_topics.append(topic)
     
     db.commit()
     db.refresh(user)
+    principal_cache.invalidate(user.id)
     return 200
     
     
@@ -146,7 +167,7 @@ def complete_topic_by_id(
     topic_id: int,
     request: Request,
     db : Session = Depends(get_db),
-    users: Query = Depends(get_users)
+    users: Query = Depends(get_users_with("progress"))
     ):
     
     if token := request.cookies.get("access_token"):
@@ -164,9 +185,11 @@ def complete_topic_by_id(
     if not topic:
         raise Exception
     
-    user.completed_topics.append(topic)
+    if topic not in user.completed_topics:
+        user.completed_topics.append(topic)
     
     db.commit()
     db.refresh(user)
+    principal_cache.invalidate(user.id)
     return 200
     
\ No newline at end of file
@@ -4,9 +4,13 @@ from fastapi import (
     status,
     Request,
     APIRouter,
-    Body
+    Body,
+    # Query из sqlalchemy.orm занят запросами get_users_with
+    Query as QueryParam
 )
-from sqlalchemy.orm import Session, joinedload, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload, load_only, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from templates import templates
 
@@ -19,62 +23,105 @@ from models import (
     Avatar
     )
 
-from schemas.users import UserRegisterSchema, UserResponse
+from schemas.users import UserRegisterSchema, UserResponse, UserListPage
 from schemas.achievements import AchievementResponse
+from schemas.gamification import UserRank
 
-from utils.db_helpher import get_db
+from utils.db_helpher import get_db, get_async_db
 from utils.functions import get_hash
+from utils import leaderboard, user_list
+from auth.principal_cache import principal_cache
+from utils.catalog_cache import catalog_cache
 
 
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
-def get_users(db: Session = Depends(get_db)) -> Query:
-    users = db.query(User).options(
-        joinedload(User.profile).joinedload(UserProfile.available_frames),
-        joinedload(User.profile).joinedload(UserProfile.current_frame),
-        joinedload(User.profile).joinedload(UserProfile.available_titles),
-        joinedload(User.profile).joinedload(UserProfile.current_title),
-        joinedload(User.profile).joinedload(UserProfile.achievements),
-        joinedload(User.profile).joinedload(UserProfile.available_avatars),
-        joinedload(User.profile).joinedload(UserProfile.current_avatar),
-        joinedload(User.gamerec),
-        joinedload(User.courses),
-        joinedload(User.completed_topics)
-    )
-    
-    
-    return users
-
-@router.get("/", response_model=List[UserResponse])
+# Профили загрузки пользователя: роут подгружает только те связи, которые ему нужны.
+# selectinload вместо joinedload, чтобы коллекции не перемножались в одном запросе
+USER_LOAD_PROFILES = {
+    # Для токенов и проверки авторизации
+    "principal": (
+        load_only(User.id, User.login, User.nickname, User.role),
+    ),
+    # Купленные курсы и пройденные темы
+    "progress": (
+        selectinload(User.courses),
+        selectinload(User.completed_topics),
+    ),
+    "titles": (
+        selectinload(User.profile).selectinload(UserProfile.available_titles),
+        selectinload(User.profile).selectinload(UserProfile.current_title),
+    ),
+    "profile_page": (
+        selectinload(User.profile).selectinload(UserProfile.current_title),
+        selectinload(User.profile).selectinload(UserProfile.current_avatar),
+        selectinload(User.profile).selectinload(UserProfile.available_avatars),
+        selectinload(User.profile).selectinload(UserProfile.achievements),
+        selectinload(User.gamerec),
+    ),
+}
+
+
+def get_users_with(profile: str):
+    options = USER_LOAD_PROFILES[profile]
+    
+    def get_users(db: Session = Depends(get_db)) -> Query:
+        return db.query(User).options(*options)
+    
+    return get_users
+
+
+@router.get("/")
 def users_page(
     request: Request,
-    users: Query = Depends(get_users)
+    after_id: int | None = None,
+    limit: int = QueryParam(user_list.USERS_PAGE_SIZE, ge=1, le=user_list.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
 ):
-    
-    #return users
-    
+    """Список пользователей постранично, следующая страница - по after_id"""
+    page = user_list.get_page(db, after_id, limit)
     return templates.TemplateResponse(
         request=request,
         name="users.html",
-        context={"request": request, "users": users.all()})
-
-
+        context={
+            "request": request,
+            "users": page["items"],
+            "next": page["next"],
+            "after_id": after_id,
+            "limit": limit
+        })
+
+
+# Два сегмента пути: любой из одного совпал бы с логином в /{login}
+@router.get("/list/page", response_model=UserListPage)
+def users_list_page(
+    after_id: int | None = None,
+    limit: int = QueryParam(user_list.USERS_PAGE_SIZE, ge=1, le=user_list.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Тот же список в JSON: следующая страница запрашивается по полю next"""
+    return user_list.get_page(db, after_id, limit)
 
 
 @router.get("/{login}", name="user_profile")
-def user_profile(login: str, request: Request, users: Query = Depends(get_users)):
-    if user := users.filter(User.login == login).first():
+async def user_profile(login: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(
+        select(User)
+        .options(*USER_LOAD_PROFILES["profile_page"])
+        .where(User.login == login)
+    )
+    
+    if user:
         title = user.profile.current_title
         lvl = user.gamerec.lvl if user.gamerec else 0
         xp = user.gamerec.xp if user.gamerec else 0
         currency = user.gamerec.currency if user.gamerec else 0
+        rank = await db.run_sync(leaderboard.get_rank, user.id)
         
         # Получаем текущий аватар
         current_avatar = user.profile.current_avatar
-        avatar_url = current_avatar.image_url[4:] if current_avatar else "/static/img/avatars/avatar1.jpg"
-        
-        print(avatar_url)
+        avatar_url = current_avatar.url if current_avatar else "/static/img/avatars/avatar1.jpg"
         
         # Получаем доступные аватары пользователя
         available_avatars = user.profile.available_avatars
@@ -87,7 +134,9 @@ def user_profile(login: str, request: Request, users: Query = Depends(get_users)
             "lvl": lvl,
             "xp": xp,
             "currency": currency,
+            "rank": rank["position"] if rank else None,
             "achievements": user.profile.achievements,
+            "avatar": current_avatar,
             "avatar_url": avatar_url,
             "available_avatars": available_avatars
         }
@@ -100,10 +149,18 @@ def user_profile(login: str, request: Request, users: Query = Depends(get_users)
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
 
 
+@router.get("/{user_id}/rank", response_model=UserRank)
+def get_user_rank(user_id: int, db: Session = Depends(get_db)):
+    if rank := leaderboard.get_rank(db, user_id):
+        return rank
+    
+    raise HTTPException(status_code=404, detail="User not found")
+
+
 @router.post("/{user_id}/set-title/{title_id}")
 def set_user_title(user_id: int,
                    title_id: int,
-                   users: Query = Depends(get_users),
+                   users: Query = Depends(get_users_with("titles")),
                    db: Session = Depends(get_db)):
     user = users.filter(User.id == user_id).first()
     if not user:
@@ -124,7 +181,7 @@ def set_user_title(user_id: int,
 @router.post("/{user_id}/grant-title/{title_id}")
 def grant_user_title(user_id: int,
                    title_id: int,
-                   users: Query = Depends(get_users),
+                   users: Query = Depends(get_users_with("titles")),
                    db: Session = Depends(get_db)):
     user = users.filter(User.id == user_id).first()
     if not user:
@@ -135,7 +192,8 @@ def grant_user_title(user_id: int,
     if not title:
         return {"message": "No such title"}
     
-    user.profile.available_titles.append(title)
+    if title not in user.profile.available_titles:
+        user.profile.available_titles.append(title)
     db.commit()
     db.refresh(user)
     
@@ -157,6 +215,8 @@ def add_achievement_to_user(user_id: int, achievement_id: int, db: Session = Dep
         raise HTTPException(status_code=400, detail="User already has this achievement")
     
     user.profile.achievements.append(achievement)
+    # Ачивки - справочник, у которого меняется владелец
+    catalog_cache.touch(db, Achievement)
     db.commit()
     db.refresh(user)
     
@@ -174,10 +234,11 @@ def remove_achievement_from_user(user_id: int, achievement_id: int, db: Session
         raise HTTPException(status_code=404, detail="Achievement not found")
     
     # Проверяем, есть ли эта ачивка у пользователя
-    if achievement not in user.achievements:
+    if achievement not in user.profile.achievements:
         raise HTTPException(status_code=400, detail="User doesn't have this achievement")
     
-    user.achievements.remove(achievement)
+    user.profile.achievements.remove(achievement)
+    catalog_cache.touch(db, Achievement)
     db.commit()
     db.refresh(user)
     
@@ -218,6 +279,7 @@ def update_user(user_id: int, user_data: UserRegisterSchema, db: Session = Depen
     
     db.commit()
     db.refresh(db_user)
+    principal_cache.invalidate(user_id)
     return db_user
 
 
@@ -230,6 +292,7 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
     
     db.delete(user)
     db.commit()
+    principal_cache.invalidate(user_id)
     return {"message": "User deleted successfully"}
 
 
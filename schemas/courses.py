@@ -16,6 +16,8 @@ class CourseCreate(BaseModel):
                         Field(max_length=39)]
     price: Annotated[float, Field(...)]
     course_lvl: Annotated[CourseLvl, Field(...)]
+    creative_weight: Annotated[float, Field(0, ge=0, le=10)]
+    analytical_weight: Annotated[float, Field(0, ge=0, le=10)]
 
 class CourseResponse(BaseModel):
     id: int
@@ -23,6 +25,8 @@ class CourseResponse(BaseModel):
     price: float
     course_lvl: CourseLvl
     description: Optional[str] = None
+    creative_weight: float = 0
+    analytical_weight: float = 0
     topics: List[TopicResponse] = []
 
     model_config = ConfigDict(from_attributes=True)
@@ -20,3 +20,25 @@ class CurrencyUpdate(BaseModel):
     currency: int
 
 
+class LeaderboardEntry(BaseModel):
+    position: int
+    user_id: int
+    nickname: str | None = None
+    points: int
+
+
+class LeaderboardCursor(BaseModel):
+    after_points: int
+    after_user_id: int
+    after_position: int
+
+
+class LeaderboardPage(BaseModel):
+    items: List[LeaderboardEntry]
+    next: Optional[LeaderboardCursor] = None
+
+
+class UserRank(BaseModel):
+    user_id: int
+    position: int
+    points: int
@@ -37,6 +37,18 @@ class User(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class Principal(BaseModel):
+    """Авторизованный пользователь без ORM-графа, хранится в кэше"""
+    id: int
+    login: str
+    nickname: Optional[str] = None
+    role: Optional[Roles] = None
+    course_ids: frozenset[int] = frozenset()
+    completed_topic_ids: frozenset[int] = frozenset()
+    
+    model_config = ConfigDict(frozen=True)
+
+
 class FrameResponse(BaseModel):
     id: int
     name: str
@@ -64,6 +76,7 @@ class AvatarResponse(BaseModel):
     name: str
     image_url: str
     is_public: bool
+    variants: Optional[dict[str, list[tuple[int, str]]]] = None
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -110,4 +123,29 @@ class UserResponse(BaseModel):
     courses: List[CourseResponse] = []
     completed_topics: List[TopicBase] = []
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UserListAvatar(BaseModel):
+    url: str
+    variants: Optional[dict[str, list[tuple[int, str]]]] = None
+
+
+class UserListEntry(BaseModel):
+    id: int
+    login: str
+    nickname: Optional[str] = None
+    role: Optional[str] = None
+    lvl: int
+    points: int
+    title: Optional[str] = None
+    avatar: Optional[UserListAvatar] = None
+
+
+class UserListCursor(BaseModel):
+    after_id: int
+
+
+class UserListPage(BaseModel):
+    items: List[UserListEntry]
+    next: Optional[UserListCursor] = None
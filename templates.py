@@ -1,7 +1,117 @@
-from fastapi.templating import Jinja2Templates
+import time
 from pathlib import Path
+from typing import NamedTuple, Optional
+
+from fastapi import Request
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, TemplateError, pass_context
+from markupsafe import Markup
+
+from assets.staticfiles import static_url_for
+from config.settings import settings
+from utils.page_cache import header_variant
 
 ROOT_PATH = Path(__file__).parent
 templates_folder = ROOT_PATH / "web" / "templates"
 
-templates = Jinja2Templates(templates_folder)
\ No newline at end of file
+
+class CountingBytecodeCache(FileSystemBytecodeCache):
+    """Кэш байткода на диске, который считает попадания: по ним видно,
+    какие шаблоны при старте скомпилированы заново"""
+
+    def __init__(self, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        super().__init__(str(directory))
+        self.hits = 0
+        self.misses = 0
+
+    def load_bytecode(self, bucket) -> None:
+        super().load_bytecode(bucket)
+        if bucket.code is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+
+def make_bytecode_cache(directory: Optional[Path]) -> Optional[CountingBytecodeCache]:
+    return CountingBytecodeCache(directory) if directory is not None else None
+
+
+bytecode_cache = make_bytecode_cache(settings.templates.bytecode_cache_dir)
+templates = Jinja2Templates(env=Environment(
+    loader=FileSystemLoader(templates_folder),
+    autoescape=True,
+    bytecode_cache=bytecode_cache,
+))
+# Ссылки на статику ведут на собранные файлы с хэшем в имени
+templates.env.globals["url_for"] = static_url_for(templates.env.globals["url_for"])
+
+
+PARTIALS = ("header", "footer")
+# Шапка и подвал у всех страниц общие: рендерим по разу на язык и состояние входа
+_partials: dict[tuple[str, str, bool], Markup] = {}
+
+
+def render_partial(request: Request, name: str) -> Markup:
+    # Двух букв языка хватает для выбора в шапке и ограничивает число вариантов
+    key = (name, *header_variant(request))
+    if (html := _partials.get(key)) is None:
+        html = _partials[key] = Markup(templates.get_template(f"partials/{name}.html").render(
+            language=key[1],
+            authenticated=key[2]
+        ))
+    return html
+
+
+@pass_context
+def partial(context, name: str) -> Markup:
+    return render_partial(context["request"], name)
+
+
+templates.env.globals["partial"] = partial
+
+
+class TemplateTiming(NamedTuple):
+    name: str
+    milliseconds: float
+    # True - байткод взят с диска, False - шаблон скомпилирован из исходника
+    cached: bool
+    error: str | None = None
+
+
+# Отчёт последней прекомпиляции, отдаётся в /admin/templates/startup
+startup_report: list[TemplateTiming] = []
+
+
+def precompile_templates(env: Environment = templates.env) -> list[TemplateTiming]:
+    """Загружает все шаблоны в память окружения и замеряет время каждого.
+
+    Первый запрос к странице после старта уже не платит за компиляцию. Ошибка
+    в одном шаблоне не останавливает приложение: она попадает в отчёт.
+    """
+    report = []
+    for name in env.list_templates(extensions=("html",)):
+        hits = bytecode_cache.hits if bytecode_cache is not None else 0
+        error = None
+        start = time.perf_counter()
+        try:
+            env.get_template(name)
+        except TemplateError as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        elapsed = (time.perf_counter() - start) * 1000
+        cached = bytecode_cache is not None and bytecode_cache.hits > hits
+        report.append(TemplateTiming(name, elapsed, cached, error))
+
+    startup_report[:] = report
+    return report
+
+
+def print_report(report: list[TemplateTiming], limit: int = 5) -> None:
+    total = sum(timing.milliseconds for timing in report)
+    compiled = sum(not timing.cached for timing in report)
+    print(f"Templates: {len(report)} loaded in {total:.1f} ms, {compiled} compiled from source")
+    for timing in sorted(report, key=lambda timing: timing.milliseconds, reverse=True)[:limit]:
+        print(f"  {timing.milliseconds:7.2f} ms {'cache ' if timing.cached else 'source'} {timing.name}")
+    for timing in report:
+        if timing.error is not None:
+            print(f"  error in {timing.name}: {timing.error}")
@@ -0,0 +1,90 @@
+"""
+Общая подготовка тестов: временная база и ключи JWT задаются через
+окружение до импорта приложения, чтобы не трогать cyberskill.db и certs/.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+ROOT = Path(__file__).parent.parent
+TMP_DIR = Path(tempfile.mkdtemp(prefix="cyberskill-tests-"))
+
+
+def write_test_keys(directory: Path) -> tuple[Path, Path]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_path = directory / "jwt-private.pem"
+    public_path = directory / "jwt-public.pem"
+    private_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ))
+    public_path.write_bytes(key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo
+    ))
+    return private_path, public_path
+
+
+private_key_path, public_key_path = write_test_keys(TMP_DIR)
+os.environ["DB__URL"] = f"sqlite:///{TMP_DIR / 'test.db'}"
+os.environ["AUTH_JWT__PRIVATE_KEY_PATH"] = str(private_key_path)
+os.environ["AUTH_JWT__PUBLIC_KEY_PATH"] = str(public_key_path)
+os.environ["TEMPLATES__BYTECODE_CACHE_DIR"] = str(TMP_DIR / "jinja")
+os.environ["TEMPLATES__PRECOMPILE"] = "false"
+
+# Статика и шаблоны подключаются путями от корня проекта
+os.chdir(ROOT)
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(scope="session")
+def app():
+    # main применяет миграции к временной базе при импорте
+    from main import app
+    return app
+
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db(app):
+    from database import session_local
+
+    with session_local() as session:
+        yield session
+
+
+def make_user(db, **fields):
+    """Пользователь с профилем и игровой записью, как после регистрации"""
+    from models import User, UserProfile, GamificationRecord
+    from static import Roles
+
+    number = db.query(User).count() + 1
+    fields.setdefault("login", f"user{number}")
+    fields.setdefault("nickname", f"user{number}")
+    fields.setdefault("email", f"user{number}@example.com")
+    fields.setdefault("role", Roles.USER)
+    user = User(profile=UserProfile(), gamerec=GamificationRecord(), **fields)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def access_cookie(user) -> dict[str, str]:
+    from utils.helpers import create_jwt, ACCESS_TOKEN_TYPE
+
+    token = create_jwt(ACCESS_TOKEN_TYPE, {"sub": str(user.id), "login": user.login})
+    return {"Cookie": f"access_token={token}"}
@@ -0,0 +1,10 @@
+def test_empty_filters_from_form(client):
+    """Форма с выбранным "Все" отправляет пустые role и title_id"""
+    response = client.get("/admin/manage/users/?q=&role=&title_id=")
+    assert response.status_code == 200
+
+
+def test_filters(client):
+    assert client.get("/admin/manage/users/?role=teacher&title_id=1").status_code == 200
+    assert client.get("/admin/manage/users/?role=nobody").status_code == 422
+    assert client.get("/admin/manage/users/?title_id=x").status_code == 422
@@ -0,0 +1,27 @@
+import asyncio
+
+from routers import auth
+from utils.functions import get_hash
+from tests.conftest import make_user
+
+
+def test_login_signs_tokens_off_event_loop(client, db, monkeypatch):
+    user = make_user(db, password=get_hash("secret"))
+    in_loop = []
+
+    def create_access_token(user):
+        try:
+            asyncio.get_running_loop()
+            in_loop.append(True)
+        except RuntimeError:
+            in_loop.append(False)
+        return sign(user)
+
+    sign = auth.create_access_token
+    monkeypatch.setattr(auth, "create_access_token", create_access_token)
+
+    response = client.post("/auth/login/", data={"username": user.login, "password": "secret"})
+    assert response.status_code == 200
+    assert response.json()["refresh_token"]
+    assert response.cookies["access_token"] == response.json()["access_token"]
+    assert in_loop == [False]
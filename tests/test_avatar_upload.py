@@ -0,0 +1,43 @@
+import io
+
+import pytest
+from PIL import Image
+from sqlalchemy import text
+
+from media.pipeline import avatar_pipeline
+from media.storage import source_path
+from models import Avatar
+
+
+@pytest.fixture
+def upload(client, monkeypatch):
+    """POST /avatars/ без фоновой обработки: как если бы она упала или потерялась"""
+    monkeypatch.setattr(avatar_pipeline, "process", lambda avatar_id, image_url: None)
+    image = io.BytesIO()
+    Image.new("RGB", (8, 8), (12, 34, 56)).save(image, format="PNG")
+    created = []
+
+    def upload() -> dict:
+        response = client.post("/avatars/", data={"name": "test"}, files={"file": ("a.png", image.getvalue(), "image/png")})
+        assert response.status_code == 200
+        created.append(response.json())
+        return response.json()
+
+    yield upload
+    for avatar in created:
+        source_path(avatar["image_url"]).unlink(missing_ok=True)
+
+
+def test_unprocessed_upload_stores_sql_null(db, upload):
+    avatar = upload()
+
+    assert db.execute(text("SELECT typeof(variants) FROM avatars WHERE id = :id"), {"id": avatar["id"]}).scalar() == "null"
+    missing = db.query(Avatar.id).filter(Avatar.variants.is_(None)).all()
+    assert (avatar["id"],) in missing
+
+
+def test_duplicate_of_unprocessed_upload_stays_unprocessed(db, upload):
+    first, second = upload(), upload()
+
+    assert first["image_url"] == second["image_url"]
+    assert db.query(Avatar).filter(Avatar.id == second["id"], Avatar.variants.is_not(None)).count() == 0
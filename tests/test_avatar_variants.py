@@ -0,0 +1,42 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from media.pipeline import VariantPipeline
+from media.storage import TEMP_NAME
+from media.variants import render_variants
+from models import Avatar
+from utils.catalog_cache import catalog_cache
+
+
+def test_concurrent_renders_of_one_image(tmp_path):
+    """Две быстрые загрузки одной картинки пишут варианты одновременно"""
+    source = tmp_path / ("a" * 64 + ".png")
+    Image.new("RGB", (300, 200), "red").save(source)
+    target = tmp_path / "variants"
+
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: render_variants(str(source), str(target), "/v"), range(4)))
+
+    assert all(result == results[0] for result in results)
+    names = [path.name for path in target.iterdir()]
+    assert not [name for name in names if TEMP_NAME.fullmatch(name)]
+    assert sorted(names) == sorted(url.rsplit("/", 1)[1] for urls in results[0].values() for _, url in urls)
+
+
+def test_process_reuses_variants_of_same_image(db):
+    variants = {"webp": [[64, "/v/same-64.webp"]]}
+    first = Avatar(name="first", image_url="/same.png", variants=variants)
+    second = Avatar(name="second", image_url="/same.png")
+    db.add_all([first, second])
+    catalog_cache.touch(db, Avatar)
+    db.commit()
+
+    pipeline = VariantPipeline()
+    pipeline.render = lambda image_url: (_ for _ in ()).throw(AssertionError("rendered again"))
+    asyncio.run(pipeline.process(second.id, second.image_url))
+
+    db.expire_all()
+    assert second.variants == variants
+    assert pipeline.stats()["failed"] == 0
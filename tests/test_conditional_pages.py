@@ -0,0 +1,41 @@
+import pytest
+
+from models import Course, Topic
+from static import CourseLvl
+from tests.conftest import make_user, access_cookie
+from utils.catalog_cache import catalog_cache
+
+
+@pytest.fixture
+def topic(db):
+    course = Course(name="course", description="", price=0, course_lvl=CourseLvl.BEGGINER)
+    course.topics = [Topic(name="topic", content="text", order=1)]
+    db.add(course)
+    catalog_cache.touch(db, Course)
+    db.commit()
+    return course.topics[0]
+
+
+@pytest.mark.parametrize("page", ["course", "topic"])
+def test_login_changes_validators(client, db, topic, page):
+    """Шапка страницы зависит от входа: гостевой ETag не подходит вошедшему"""
+    path = f"/courses/{topic.course_id}" if page == "course" else f"/topics/{topic.id}"
+    cookie = access_cookie(make_user(db))
+
+    guest = client.get(path)
+    assert guest.status_code == 200
+    assert guest.headers["cache-control"].startswith("private")
+    assert "Cookie" in guest.headers["vary"]
+
+    assert client.get(path, headers={"If-None-Match": guest.headers["etag"]}).status_code == 304
+    logged_in = client.get(path, headers={"If-None-Match": guest.headers["etag"], **cookie})
+    assert logged_in.status_code == 200
+    assert logged_in.headers["etag"] != guest.headers["etag"]
+    assert "last-modified" not in logged_in.headers
+
+
+def test_language_changes_validators(client, topic):
+    path = f"/courses/{topic.course_id}"
+    ru = client.get(path, headers={"Accept-Language": "ru"})
+    en = client.get(path, headers={"Accept-Language": "en", "If-None-Match": ru.headers["etag"]})
+    assert en.status_code == 200
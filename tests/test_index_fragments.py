@@ -0,0 +1,25 @@
+from models import Course
+from static import CourseLvl
+from utils.catalog_cache import catalog_cache
+
+
+def first_pro_course(db) -> Course:
+    course = db.query(Course).filter(Course.course_lvl == CourseLvl.PRO).order_by(Course.id).first()
+    if course is None:
+        course = Course(name="pro course", description="", price=0, course_lvl=CourseLvl.PRO)
+        db.add(course)
+        catalog_cache.touch(db, Course)
+        db.commit()
+    return course
+
+
+def test_course_fragments_follow_catalog_version(client, db):
+    course = first_pro_course(db)
+    assert course.name in client.get("/").text
+
+    # Фрагмент свежий по времени, но справочник изменился
+    course.name = "renamed pro course"
+    catalog_cache.touch(db, Course)
+    db.commit()
+
+    assert "renamed pro course" in client.get("/").text
@@ -0,0 +1,120 @@
+import random
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from database import Base
+from models import User, GamificationRecord
+from utils import leaderboard
+from utils.rank_index import RankIndex, rank_index
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Пустая база: позиции зависят от всех записей таблицы"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'leaderboard.db'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def add_record(db, user_id, xp):
+    db.add(GamificationRecord(user_id=user_id, lvl=1, xp=xp))
+
+
+def test_rank_matches_page_positions(db):
+    db.add_all([User(id=1, login="first"), User(id=2, login="second"), User(id=3, login="third")])
+    for user_id, xp in [(1, 500), (2, 300), (3, 300)]:
+        add_record(db, user_id, xp)
+    # Записи без пользователя на страницу не попадают и в ранге не считаются
+    add_record(db, None, 1000)
+    add_record(db, 99, 900)
+    db.commit()
+
+    first = leaderboard.get_page(db, limit=2)
+    second = leaderboard.get_page(db, **first["next"], limit=2)
+    positions = {item["user_id"]: item["position"] for item in first["items"] + second["items"]}
+
+    assert positions == {1: 1, 2: 2, 3: 3}
+    for user_id, position in positions.items():
+        assert leaderboard.get_rank(db, user_id)["position"] == position
+    assert leaderboard.get_rank(db, 99) is None
+
+
+def test_cursor_page_does_not_count(db):
+    db.add_all([User(id=id, login=f"user{id}") for id in range(1, 6)])
+    for user_id in range(1, 6):
+        add_record(db, user_id, user_id * 100)
+    db.commit()
+
+    first = leaderboard.get_page(db, limit=2)
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    second = leaderboard.get_page(db, **first["next"], limit=2)
+
+    assert [item["position"] for item in second["items"]] == [3, 4]
+    assert second["next"]["after_position"] == 4
+    assert len(statements) == 1 and "count(" not in statements[0].lower()
+
+    # Курсор без позиции из старых ссылок
+    cursor = {key: value for key, value in first["next"].items() if key != "after_position"}
+    assert leaderboard.get_page(db, **cursor, limit=2)["items"] == second["items"]
+
+
+def brute_ahead(records: dict[int, int], points: int, user_id: int) -> int:
+    return sum(1 for other, other_points in records.items() if (-other_points, other) < (-points, user_id))
+
+
+def test_rank_index_matches_brute_force():
+    rng = random.Random(7)
+    records = {user_id: rng.randrange(0, 50) for user_id in range(1, 60)}
+    index = RankIndex([(points, user_id) for user_id, points in records.items()], version=1)
+
+    for _ in range(300):
+        user_id = rng.randrange(1, 80)
+        if user_id in records and rng.random() < 0.3:
+            assert index.remove(records.pop(user_id), user_id)
+        else:
+            if user_id in records:
+                assert index.remove(records[user_id], user_id)
+            # В том числе далеко за границами дерева
+            records[user_id] = rng.choice([rng.randrange(0, 60), rng.randrange(-500, 5000)])
+            index.add(records[user_id], user_id)
+
+        points, probe = rng.randrange(-600, 5100), rng.randrange(0, 90)
+        assert index.count_ahead(points, probe) == brute_ahead(records, points, probe)
+    assert len(index) == len(records)
+    assert not index.remove(10_000, 1)
+
+
+def test_rank_index_follows_writes(db, tmp_path):
+    users = [User(id=id, login=f"user{id}", gamerec=GamificationRecord(lvl=1, xp=id * 10)) for id in range(1, 4)]
+    db.add_all(users)
+    db.commit()
+    assert leaderboard.get_rank(db, 1)["position"] == 3
+    loads = rank_index.loads
+
+    # Свои изменения применяются из событий flush без перечитывания
+    users[0].gamerec.xp = 1000
+    db.commit()
+    assert leaderboard.get_rank(db, 1)["position"] == 1
+    db.delete(users[2].gamerec)
+    db.commit()
+    assert leaderboard.get_rank(db, 2)["position"] == 2
+    assert rank_index.loads == loads
+
+    # Откат изменения, уже применённого к индексу, и затем запись другого
+    # процесса: версии снова совпадут, индекс должен быть перечитан
+    users[1].gamerec.xp = 5000
+    db.flush()
+    db.rollback()
+    other = create_engine(db.get_bind().url)
+    with Session(other) as other_db:
+        other_db.get(GamificationRecord, users[0].gamerec.id).xp = 0
+        other_db.commit()
+    other.dispose()
+
+    assert leaderboard.get_rank(db, 2)["position"] == 1
+    assert [item["user_id"] for item in leaderboard.get_page(db)["items"]] == [2, 1]
@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import Index, create_engine, inspect, text
+
+from database import Base
+from migrations.runner import upgrade, head
+from migrations.snapshots import MODEL_INDEXES
+from migrations.versions import MIGRATIONS, avatar_variants_null, deduplicate
+
+
+@pytest.fixture
+def connection(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        yield connection
+    engine.dispose()
+
+
+def index(name: str) -> tuple:
+    """(таблица, индекс, колонки) уникального индекса из снимка 0003"""
+    return next(index for index in MODEL_INDEXES if index[1] == name)[:3]
+
+
+def ids(connection, table: str) -> list[int]:
+    return list(connection.execute(text(f"SELECT id FROM {table} ORDER BY id")).scalars())
+
+
+def test_removes_exact_copies_only(connection):
+    connection.execute(text("DROP INDEX uq_student_course"))
+    connection.execute(text(
+        "INSERT INTO student_course (id, student_id, course_id) VALUES "
+        "(1, 1, 1), (2, 1, 1), (3, 1, 2), (4, NULL, 1), (5, NULL, 1)"
+    ))
+
+    assert deduplicate(connection, *index("uq_student_course")) == 1
+    # Строки с NULL в ключе уникальный индекс допускает
+    assert ids(connection, "student_course") == [1, 3, 4, 5]
+
+
+def test_differing_duplicates_abort(connection):
+    connection.execute(text("DROP INDEX ix_game_records_user_id"))
+    connection.execute(text(
+        "INSERT INTO game_records (id, user_id, xp, lvl, points) VALUES (1, 7, 0, 1, 40), (2, 7, 50, 9, 380)"
+    ))
+
+    with pytest.raises(RuntimeError, match=r"\(7,\): id 1, 2"):
+        deduplicate(connection, *index("ix_game_records_user_id"))
+    assert ids(connection, "game_records") == [1, 2]
+
+
+def test_referenced_duplicates_abort(connection):
+    """На профили ссылаются ачивки и покупки: даже полные копии не удаляются"""
+    connection.execute(text("DROP INDEX ix_users_profiles_user_id"))
+    connection.execute(text("INSERT INTO users_profiles (id, user_id) VALUES (1, 3), (2, 3)"))
+    connection.execute(text("INSERT INTO achievements (id, name, user_id) VALUES (1, 'first', 2)"))
+
+    with pytest.raises(RuntimeError, match="users_profiles"):
+        deduplicate(connection, *index("ix_users_profiles_user_id"))
+    assert ids(connection, "users_profiles") == [1, 2]
+
+
+def test_json_null_variants_become_sql_null(connection):
+    connection.execute(text(
+        "INSERT INTO avatars (id, image_url, variants) VALUES (1, '/a.png', 'null'), (2, '/b.png', '{\"webp\": []}')"
+    ))
+
+    avatar_variants_null(connection)
+    assert ids(connection, "avatars WHERE variants IS NULL") == [1]
+
+
+def schema(engine) -> dict:
+    inspector = inspect(engine)
+    return {
+        table: {
+            "columns": {
+                (column["name"], str(column["type"]), column["nullable"])
+                for column in inspector.get_columns(table)
+            },
+            "indexes": {
+                (index["name"], tuple(index["column_names"]), bool(index["unique"]))
+                for index in inspector.get_indexes(table)
+            },
+        }
+        for table in inspector.get_table_names()
+    }
+
+
+def test_fresh_database_reaches_models_schema(tmp_path):
+    """Новая база проходит все миграции от снимка 0001 и получает схему моделей"""
+    migrated = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    created = create_engine(f"sqlite:///{tmp_path / 'created.db'}")
+    Base.metadata.create_all(bind=created)
+
+    assert [migration.version for migration in upgrade(migrated, MIGRATIONS)] == list(range(1, head(MIGRATIONS) + 1))
+    assert schema(migrated) == schema(created)
+
+
+def test_migrations_do_not_follow_models(tmp_path):
+    """Новый индекс в моделях на колонку из 0007 не ломает 0003 на новой базе"""
+    table = Base.metadata.tables["courses"]
+    extra = Index("ix_courses_updated_at", table.c.updated_at)
+    try:
+        upgrade(create_engine(f"sqlite:///{tmp_path / 'fresh.db'}"), MIGRATIONS)
+    finally:
+        table.indexes.discard(extra)
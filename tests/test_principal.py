@@ -0,0 +1,11 @@
+from tests.conftest import make_user
+from utils.helpers import create_refresh_token
+
+
+def test_user_without_nickname_is_authenticated(client, db):
+    """В старых базах nickname бывает NULL"""
+    user = make_user(db, nickname=None)
+
+    response = client.post("/auth/refresh/", headers={"Authorization": f"Bearer {create_refresh_token(user)}"})
+    assert response.status_code == 200
+    assert response.json()["access_token"]
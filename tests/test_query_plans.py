@@ -0,0 +1,112 @@
+"""
+EXPLAIN QUERY PLAN для горячих запросов: ни один не должен делать
+полный проход по таблице (SCAN без индекса).
+"""
+import re
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import (
+    User,
+    UserProfile,
+    Topic,
+    TestAnswer as Answer,
+    Course,
+    Achievement,
+    Title,
+    Goods,
+    StudentCourse,
+    StudentTopics,
+    GamificationRecord
+)
+from routers.users import USER_LOAD_PROFILES
+from static import CourseLvl
+from utils import leaderboard, user_list
+from utils.catalog_cache import catalog_cache
+from utils.functions import get_hash
+
+
+FULL_SCAN = re.compile(r"^SCAN (\S+)( AS \S+)?$")
+
+
+HOT_QUERIES = {
+    "login": lambda db: db.query(User).where(User.login == "user").filter(User.password == get_hash("pw")).first(),
+    "email": lambda db: db.query(User).filter(User.email == "user@mail.ru").first(),
+    "profile page": lambda db: db.scalar(select(User).options(*USER_LOAD_PROFILES["profile_page"]).where(User.login == "user")),
+    "titles profile": lambda db: db.query(User).options(*USER_LOAD_PROFILES["titles"]).filter(User.id == 1).first(),
+    "progress profile": lambda db: db.query(User).options(*USER_LOAD_PROFILES["progress"]).filter(User.id == 1).first(),
+    "course topics": lambda db: db.query(Topic).filter(Topic.course_id == 1).all(),
+    "question answers": lambda db: db.query(Answer).filter(Answer.question_id == 1).all(),
+    "courses by level": lambda db: db.query(Course).where(Course.course_lvl == CourseLvl.BEGGINER).limit(3).all(),
+    "achievement by name": lambda db: db.query(Achievement).filter(Achievement.name == "a").first(),
+    "title by name": lambda db: db.query(Title).filter(Title.name == "t").first(),
+    "goods by name": lambda db: db.query(Goods).filter(Goods.name == "g").first(),
+    "principal courses": lambda db: db.scalars(select(StudentCourse.course_id).where(StudentCourse.student_id == 1)).all(),
+    "principal topics": lambda db: db.scalars(select(StudentTopics.topic_id).where(StudentTopics.student_id == 1)).all(),
+    "gamerec by user": lambda db: db.query(GamificationRecord).filter(GamificationRecord.user_id == 1).first(),
+    "leaderboard top": lambda db: leaderboard.get_top(db),
+    "leaderboard page": lambda db: leaderboard.get_page(db, 10, 1),
+    "user rank": lambda db: leaderboard.get_rank(db, 1),
+    "users page": lambda db: user_list.get_page(db, 1),
+    "catalog version": lambda db: catalog_cache.version(db, "courses"),
+}
+
+
+def seed(db) -> None:
+    """Один пользователь со связями, чтобы выполнились и selectinload-запросы"""
+    course = Course(name="course", course_lvl=CourseLvl.BEGGINER)
+    db.add(User(
+        login="user",
+        nickname="user",
+        profile=UserProfile(achievements=[Achievement(name="a")], available_titles=[Title(name="t")]),
+        gamerec=GamificationRecord(),
+        courses=[course],
+        completed_topics=[Topic(name="topic", course_id=1)]
+    ))
+    db.commit()
+
+
+class PlanCollector:
+    def __init__(self, engine):
+        self.plans: list[tuple[str, list[str]]] = []
+        event.listen(engine, "after_cursor_execute", self.after_execute)
+
+    def after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        plan_cursor = cursor.connection.cursor()
+        rows = plan_cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        plan_cursor.close()
+        self.plans.append((statement, [row[3] for row in rows]))
+
+
+@pytest.fixture(scope="module")
+def session_local():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session_local = sessionmaker(bind=engine)
+    with session_local() as db:
+        seed(db)
+    yield session_local
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_no_full_scans(session_local, name):
+    engine = session_local.kw["bind"]
+    collector = PlanCollector(engine)
+    try:
+        with session_local() as db:
+            HOT_QUERIES[name](db)
+    finally:
+        event.remove(engine, "after_cursor_execute", collector.after_execute)
+
+    assert collector.plans
+    scans = [
+        (statement, detail)
+        for statement, details in collector.plans
+        for detail in details
+        if FULL_SCAN.match(detail)
+    ]
+    assert not scans
@@ -0,0 +1,30 @@
+import pytest
+
+from migrations.versions import LEGACY_SKILL_PROFILES
+from utils.recommendations import CourseRecommender
+
+
+@pytest.fixture
+def recommender():
+    return CourseRecommender([(id, *profile) for id, profile in LEGACY_SKILL_PROFILES.items()], version=1)
+
+
+@pytest.mark.parametrize(("scores", "course_id"), [
+    # Сам профиль курса
+    *((profile, id) for id, profile in LEGACY_SKILL_PROFILES.items()),
+    # Ближайший профиль, а не прежняя цепочка условий
+    ((6, 0), 5),
+    ((10, 0), 5),
+    ((0, 10), 3),
+    ((10, 10), 4),
+    ((1, 1), 1),
+    ((0, 5), 6),
+    ((5, 6), 2),
+])
+def test_nearest_profile(recommender, scores, course_id):
+    assert recommender.recommend(*scores)[0] == course_id
+
+
+def test_others_by_distance(recommender):
+    # Равные расстояния до 1 и 6 - выше меньший id
+    assert recommender.recommend(1, 2.5) == (1, [6, 2, 3])
@@ -0,0 +1,30 @@
+from models import TestQuestion as Question, TestAnswer as Answer
+from utils.catalog_cache import catalog_cache
+
+
+def submit(client, question_id: int, answer_id: int):
+    return client.post("/test/submit", json={"answers": [{"question_id": question_id, "answer_id": answer_id}]})
+
+
+def test_answers_written_by_another_worker(client, db):
+    """Индекс этого процесса сверяется с версией в базе, а не только сбрасывается своим CRUD"""
+    question = Question(text="q", order=1)
+    db.add(question)
+    db.commit()
+    created = client.post("/test/api/test/answers", json={
+        "question_id": question.id, "text": "a", "creative_value": 3, "analytical_value": 1
+    }).json()
+    assert submit(client, question.id, created["id"]).json()["creative_score"] == 3
+
+    # Другой воркер добавляет ответ и меняет баллы старого
+    answer = Answer(question_id=question.id, text="b", creative_value=0, analytical_value=4)
+    db.add(answer)
+    db.get(Answer, created["id"]).creative_value = 7
+    catalog_cache.touch(db, Answer)
+    db.commit()
+
+    assert submit(client, question.id, answer.id).json()["analytical_score"] == 4
+    assert submit(client, question.id, created["id"]).json()["creative_score"] == 7
+
+    client.delete(f"/test/api/test/answers/{answer.id}")
+    assert submit(client, question.id, answer.id).status_code == 400
@@ -0,0 +1,17 @@
+import json
+from pathlib import Path
+
+from tests.conftest import make_user
+
+
+MANIFEST = json.loads(Path("web/static/build/manifest.json").read_text())
+
+
+def test_profile_links_built_assets(client, db):
+    """Стили и скрипты профиля идут через манифест: хэш в имени и долгий кэш"""
+    user = make_user(db)
+    html = client.get(f"/users/{user.login}").text
+
+    assert 'href="/static/css/' not in html and 'src="/static/js/' not in html
+    for path in ("css/main.css", "css/profile.css", "js/profile.js"):
+        assert f"/static/{MANIFEST[path]}" in html
@@ -0,0 +1,58 @@
+import asyncio
+
+import models
+from utils import test_stats
+from utils.test_stats import SubmissionWriter, submission_writer
+
+
+def fail_batch(db, batch):
+    raise RuntimeError("database is locked")
+
+
+def test_due_after_max_delay():
+    writer = SubmissionWriter(max_delay=0)
+    assert not writer.due()
+    writer.add(1, 2, [])
+    assert writer.due()
+
+
+def test_failed_flush_keeps_submissions(db, monkeypatch):
+    writer = SubmissionWriter()
+    writer.add(1, 2, [])
+    monkeypatch.setattr(test_stats, "write_batch", fail_batch)
+
+    assert writer.try_flush(db) == 0
+    assert len(writer) == 1
+
+
+def test_submit_survives_failed_flush(client, monkeypatch):
+    monkeypatch.setattr(test_stats, "write_batch", fail_batch)
+    monkeypatch.setattr(submission_writer, "batch_size", 1)
+
+    response = client.post("/test/submit", json={"answers": []})
+    assert response.status_code == 200
+    assert len(submission_writer) == 1
+
+
+def test_periodic_flush_writes_waiting_batch(db, monkeypatch):
+    writer = SubmissionWriter(max_delay=0.01)
+    writer.add(1, 2, [])
+    before = db.query(models.TestSubmission).count()
+
+    async def run() -> None:
+        task = asyncio.create_task(writer.flush_periodically())
+        while len(writer):
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+    assert db.query(models.TestSubmission).count() == before + 1
+
+
+def test_admin_stats_page_survives_failed_flush(client, monkeypatch):
+    monkeypatch.setattr(test_stats, "write_batch", fail_batch)
+    submission_writer.add(1, 2, [])
+
+    response = client.get("/admin/manage/test/")
+    assert response.status_code == 200
+    assert len(submission_writer) >= 1
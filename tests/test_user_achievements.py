@@ -0,0 +1,25 @@
+from models import Achievement
+from tests.conftest import make_user
+from utils.catalog_cache import catalog_cache
+
+
+def owner(db, achievement_id: int):
+    return next(item.user_id for item in catalog_cache.get(db, Achievement) if item.id == achievement_id)
+
+
+def test_grant_and_revoke_refresh_catalog(client, db):
+    user = make_user(db)
+    achievement = Achievement(name="first steps", description="")
+    db.add(achievement)
+    catalog_cache.touch(db, Achievement)
+    db.commit()
+    # Кэш прогрет до выдачи ачивки
+    assert owner(db, achievement.id) is None
+
+    assert client.post(f"/users/{user.id}/achievements/{achievement.id}").status_code == 200
+    db.expire_all()
+    assert owner(db, achievement.id) == user.profile.id
+
+    assert client.delete(f"/users/{user.id}/achievements/{achievement.id}").status_code == 200
+    db.expire_all()
+    assert owner(db, achievement.id) is None
@@ -0,0 +1,55 @@
+"""
+Профили USER_LOAD_PROFILES: фиксированное число запросов на загрузку
+пользователя и строки, растущие линейно с размером связей, а не их
+произведением, как у старого графа из joinedload.
+"""
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.user_loaders import OLD_GRAPH, Counter, seed
+from database import Base
+from models import User
+from routers.users import USER_LOAD_PROFILES
+
+
+EXPECTED_QUERIES = {
+    "principal": 1,
+    # Пользователь + по запросу на каждую selectinload-связь
+    "progress": 3,
+    # Текущего титула в seed нет, его запрос пропускается
+    "titles": 3,
+    "profile_page": 5,
+}
+
+
+def load(size: int, options) -> Counter:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session_local = sessionmaker(bind=engine)
+    with session_local() as db:
+        user_id = seed(db, size)
+
+    counter = Counter(engine)
+    with session_local() as db:
+        assert db.query(User).options(*options).filter(User.id == user_id).first() is not None
+    event.remove(engine, "after_cursor_execute", counter.after_execute)
+    engine.dispose()
+    return counter
+
+
+def test_every_profile_has_expected_queries():
+    assert set(EXPECTED_QUERIES) == set(USER_LOAD_PROFILES)
+
+
+@pytest.mark.parametrize("profile", USER_LOAD_PROFILES)
+def test_profile_queries(profile):
+    small, large = load(3, USER_LOAD_PROFILES[profile]), load(6, USER_LOAD_PROFILES[profile])
+
+    assert small.queries == large.queries == EXPECTED_QUERIES[profile]
+    assert large.rows <= 2 * small.rows
+
+
+def test_old_graph_multiplies_rows():
+    """Контроль самого теста: декартово произведение joinedload он замечает"""
+    assert load(6, OLD_GRAPH).rows > 2 * load(3, OLD_GRAPH).rows
@@ -0,0 +1,19 @@
+from tests.conftest import make_user
+
+
+def test_login_page_is_a_profile(client, db):
+    make_user(db, login="page", nickname="pager")
+
+    response = client.get("/users/page")
+    assert response.status_code == 200
+    assert "pager" in response.text
+
+
+def test_json_pages(client, db):
+    for _ in range(3):
+        make_user(db)
+
+    first = client.get("/users/list/page", params={"limit": 2}).json()
+    assert len(first["items"]) == 2
+    second = client.get("/users/list/page", params={"limit": 2, **first["next"]}).json()
+    assert second["items"][0]["id"] > first["items"][-1]["id"]
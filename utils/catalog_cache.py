@@ -0,0 +1,109 @@
+from threading import Lock
+from typing import Any, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session, selectinload
+
+from models import (
+    CatalogVersion,
+    Title,
+    Achievement,
+    Avatar,
+    Goods,
+    Course
+)
+
+
+class Catalog(NamedTuple):
+    model: Any
+    options: tuple = ()
+    # Связи, загруженные options: их объекты тоже отвязываем от сессии
+    related: tuple[str, ...] = ()
+
+
+CATALOGS = {
+    catalog.model.__tablename__: catalog
+    for catalog in (
+        Catalog(Title),
+        Catalog(Achievement),
+        Catalog(Avatar),
+        Catalog(Goods),
+        Catalog(Course, (selectinload(Course.topics),), ("topics",)),
+    )
+}
+
+
+class CatalogEntry(NamedTuple):
+    version: int
+    items: list
+
+
+class CatalogCache:
+    """Справочники целиком в памяти процесса.
+
+    Актуальность сверяется по строке catalog_versions, которую изменение
+    справочника увеличивает в своей транзакции. Так кэш сбрасывается во всех
+    воркерах, а не только в том, что обработал запрос на изменение.
+
+    Объекты отвязаны от сессии и общие для всех запросов: только для чтения,
+    в связи пользователей их не добавлять.
+    """
+
+    def __init__(self, catalogs: dict[str, Catalog] = CATALOGS):
+        self.catalogs = catalogs
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, CatalogEntry] = {}
+        self._lock = Lock()
+
+    def version(self, db: Session, name: str) -> int:
+        return db.scalar(select(CatalogVersion.version).where(CatalogVersion.name == name)) or 0
+
+    def get_entry(self, db: Session, model) -> CatalogEntry:
+        name = model.__tablename__
+        version = self.version(db, name)
+
+        entry = self._entries.get(name)
+        if entry is not None and entry.version == version:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = CatalogEntry(version, self._load(db, self.catalogs[name]))
+        with self._lock:
+            self._entries[name] = entry
+        return entry
+
+    def get(self, db: Session, model) -> list:
+        return self.get_entry(db, model).items
+
+    def _load(self, db: Session, catalog: Catalog) -> list:
+        items = db.scalars(select(catalog.model).options(*catalog.options).order_by(catalog.model.id)).all()
+        for item in items:
+            for name in catalog.related:
+                for related in getattr(item, name):
+                    db.expunge(related)
+            db.expunge(item)
+        return list(items)
+
+    def touch(self, db: Session, *models) -> None:
+        """Увеличивает версии справочников. Вызывать до commit изменения, в той же транзакции"""
+        stmt = insert(CatalogVersion)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["name"],
+                set_={"version": CatalogVersion.version + 1}
+            ),
+            [{"name": model.__tablename__, "version": 1} for model in models]
+        )
+
+    def stats(self) -> dict:
+        return {
+            "catalogs": {name: entry.version for name, entry in self._entries.items()},
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+catalog_cache = CatalogCache()
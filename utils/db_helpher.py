@@ -1,8 +1,13 @@
-from database import session_local
+from database import session_local, async_session_local
 
 def get_db():
     db = session_local()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with async_session_local() as db:
+        yield db
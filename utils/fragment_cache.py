@@ -0,0 +1,75 @@
+import time
+from threading import Lock
+from typing import Callable, NamedTuple
+
+from markupsafe import Markup
+
+
+class Fragment(NamedTuple):
+    html: Markup
+    rendered_at: float
+    # Версия справочника, из которого нарисован фрагмент
+    version: int | None = None
+
+
+class FragmentCache:
+    """Готовые куски HTML страниц с обновлением по stale-while-revalidate.
+
+    Устаревший фрагмент продолжает отдаваться, пока его перерисовывают в фоне;
+    перерисовкой одного ключа занимается только один запрос. Фрагмент из
+    справочника хранит его версию: после изменения справочника он не
+    отдаётся вовсе, а перерисовывается сразу.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._fragments: dict[str, Fragment] = {}
+        self._refreshing: set[str] = set()
+        self._lock = Lock()
+
+    def lookup(self, key: str, max_age: float, version: int | None = None) -> tuple[Markup | None, bool]:
+        """(html или None, нужно ли запустить фоновое обновление)"""
+        fragment = self._fragments.get(key)
+        if fragment is None or fragment.version != version:
+            self.misses += 1
+            return None, False
+
+        if time.monotonic() - fragment.rendered_at < max_age:
+            self.hits += 1
+            return fragment.html, False
+
+        self.stale_hits += 1
+        with self._lock:
+            # Обновление уже запущено другим запросом
+            if key in self._refreshing:
+                return fragment.html, False
+            self._refreshing.add(key)
+        return fragment.html, True
+
+    def refresh(self, key: str, render: Callable[[], str], version: int | None = None) -> Markup:
+        """version - прочитанная до render: если справочник изменится во время
+        перерисовки, следующий запрос просто нарисует фрагмент ещё раз"""
+        try:
+            html = Markup(render())
+            self._fragments[key] = Fragment(html, time.monotonic(), version)
+            return html
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._fragments.clear()
+
+    def stats(self) -> dict:
+        return {
+            "fragments": {key: round(time.monotonic() - fragment.rendered_at, 1) for key, fragment in self._fragments.items()},
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+        }
+
+
+fragment_cache = FragmentCache()
@@ -7,10 +7,13 @@ from datetime import timedelta
 from fastapi import Form, HTTPException, status, Depends
 from models import User
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from utils.functions import get_hash
-from utils.db_helpher import get_db
+from utils.db_helpher import get_db, get_async_db
+from utils import leaderboard
 
 
 TOKEN_TYPE_FIELD = "type"
@@ -53,38 +56,15 @@ def create_refresh_token(user: UserSchema) -> str:
     
     
 
-def validate_auth_user(username: str = Form(), password: str = Form(), db: Session = Depends(get_db)):
+async def validate_auth_user(username: str = Form(), password: str = Form(), db: AsyncSession = Depends(get_async_db)):
     unauthed_exc = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,\
                                  detail="invalid login or password")
 
-    if not (user:= db.query(User).where(User.login == username).filter(User.password == get_hash(password)).first()):
+    if not (user:= await db.scalar(select(User).where(User.login == username).filter(User.password == get_hash(password)))):
         raise unauthed_exc
     
     return user
 
-import random
 
-# TODO: Модели поменяли - это наеблнулось
 def get_leaderboard(db: Session = Depends(get_db)):
-    users = db.query(User).all()
-    
-    leaderboard_list = []
-    for user in users:
-        total_xp = user.gamerec.lvl * 100 + user.gamerec.xp
-        points = round(total_xp / 2.5) 
-        leaderboard_list.append((user.nickname, points))
-    
-    leaderboard_list.sort(key=lambda x: x[1], reverse=True)
-    
-    result = []
-    for position, (nickname, points) in enumerate(leaderboard_list, 1):
-        if position > 5:
-            break
-        
-        result.append({
-            "position": position,
-            "nickname": nickname,
-            "points": points
-        })
-    
-    return result
+    return leaderboard.get_top(db)
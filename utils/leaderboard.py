@@ -0,0 +1,102 @@
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from models import User, GamificationRecord
+from utils.rank_index import rank_index
+
+
+LEADERBOARD_SIZE = 5
+MAX_PAGE_SIZE = 100
+
+
+def get_top(db: Session, limit: int = LEADERBOARD_SIZE) -> list[dict]:
+    """Топ пользователей по очкам одним запросом по индексу"""
+    rows = db.query(User.nickname, GamificationRecord.points)\
+        .join(GamificationRecord, GamificationRecord.user_id == User.id)\
+        .order_by(GamificationRecord.points.desc(), GamificationRecord.user_id)\
+        .limit(limit)\
+        .all()
+
+    return [
+        {
+            "position": position,
+            "nickname": nickname,
+            "points": points
+        }
+        for position, (nickname, points) in enumerate(rows, 1)
+    ]
+
+
+def count_ahead(db: Session, points: int, user_id: int) -> int:
+    """Сколько записей стоит выше (points, user_id) в порядке лидерборда.
+
+    O(log n) по индексу мест в памяти и один запрос версии. Как и в get_page,
+    учитываются только записи существующих пользователей.
+    """
+    return rank_index.get(db).count_ahead(points, user_id)
+
+
+def get_rank(db: Session, user_id: int) -> dict | None:
+    """Место пользователя в лидерборде"""
+    points = db.query(GamificationRecord.points)\
+        .join(User, User.id == GamificationRecord.user_id)\
+        .filter(GamificationRecord.user_id == user_id)\
+        .scalar()
+    if points is None:
+        return None
+
+    return {
+        "user_id": user_id,
+        "position": count_ahead(db, points, user_id) + 1,
+        "points": points
+    }
+
+
+def get_page(
+    db: Session,
+    after_points: int | None = None,
+    after_user_id: int | None = None,
+    limit: int = LEADERBOARD_SIZE,
+    after_position: int | None = None
+) -> dict:
+    """Страница лидерборда по ключу (points, user_id) последней записи предыдущей страницы, без OFFSET.
+
+    Позиция последней записи приходит в курсоре, и страница нумеруется от неё,
+    а не пересчётом всех записей выше. Без неё (старые ссылки) считается count_ahead.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    query = db.query(GamificationRecord.user_id, User.nickname, GamificationRecord.points)\
+        .join(User, User.id == GamificationRecord.user_id)
+
+    first_position = 1
+    if after_points is not None and after_user_id is not None:
+        query = query.filter(or_(
+            GamificationRecord.points < after_points,
+            and_(GamificationRecord.points == after_points, GamificationRecord.user_id > after_user_id)
+        ))
+        if after_position is None:
+            after_position = count_ahead(db, after_points, after_user_id) + 1
+        first_position = after_position + 1
+
+    rows = query.order_by(GamificationRecord.points.desc(), GamificationRecord.user_id)\
+        .limit(limit + 1)\
+        .all()
+
+    items = [
+        {
+            "position": position,
+            "user_id": user_id,
+            "nickname": nickname,
+            "points": points
+        }
+        for position, (user_id, nickname, points) in enumerate(rows[:limit], first_position)
+    ]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = {"after_points": last["points"], "after_user_id": last["user_id"], "after_position": last["position"]}
+
+    return {"items": items, "next": next_cursor}
+
@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import wraps
+from typing import Callable, NamedTuple
+
+from fastapi import Request, Response
+
+from utils.ttl_cache import TTLCache
+
+
+PAGE_TTL_SECONDS = 3600
+# Браузер каждый раз переспрашивает страницу, но получает 304 по ETag
+CACHE_CONTROL = "public, no-cache"
+# Меньше gzip не сжимаем: заголовки съедят выигрыш
+GZIP_MIN_SIZE = 1024
+# От этих заголовков запроса зависит общая шапка страниц
+HEADER_VARY = "Accept-Language, Cookie"
+
+
+class CachedPage(NamedTuple):
+    body: bytes
+    gzipped: bytes | None
+    etag: str
+    media_type: str | None
+    status_code: int
+
+
+def request_language(request: Request) -> str:
+    """Первый язык из Accept-Language"""
+    return request.headers.get("accept-language", "").split(",")[0].split(";")[0].strip().lower()[:8]
+
+
+def is_authenticated(request: Request) -> bool:
+    return "access_token" in request.cookies
+
+
+def header_variant(request: Request) -> tuple[str, bool]:
+    """Чем различаются шапки страниц: два символа языка и вход"""
+    return request_language(request)[:2], is_authenticated(request)
+
+
+def page_key(request: Request) -> tuple[str, str, str, bool]:
+    """Ключ кэша: url_for в шаблонах даёт абсолютные ссылки, поэтому учитываем
+    адрес сайта, а не только путь; шапка зависит от языка и входа"""
+    return str(request.base_url), request.url.path, request_language(request), is_authenticated(request)
+
+
+def accepts_gzip(request: Request) -> bool:
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if not (header := request.headers.get("if-none-match")):
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def make_etag(*parts) -> str:
+    """Сильный ETag из версии содержимого и всего, от чего ещё зависит страница"""
+    return f'"{hashlib.sha256(repr(parts).encode()).hexdigest()[:32]}"'
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite отдаёт DateTime без часового пояса, пишем мы его в UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """Условный GET: If-None-Match главнее, If-Modified-Since - только без него"""
+    if request.headers.get("if-none-match") is not None:
+        return etag_matches(request, etag)
+
+    if last_modified is None or not (since := request.headers.get("if-modified-since")):
+        return False
+    try:
+        since_date = parsedate_to_datetime(since)
+    except (TypeError, ValueError):
+        return False
+    # Last-Modified с точностью до секунды
+    return as_utc(last_modified).replace(microsecond=0) <= as_utc(since_date)
+
+
+def conditional_headers(
+    etag: str,
+    last_modified: datetime | None = None,
+    private: bool = False,
+    vary: str | None = None
+) -> dict[str, str]:
+    """Заголовки для страниц с проверкой по ETag. private - страница зависит от пользователя"""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache" if private else CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(as_utc(last_modified), usegmt=True)
+    if vary is not None:
+        headers["Vary"] = vary
+    return headers
+
+
+class PageCache(TTLCache):
+    """Готовые байты страниц, которые не зависят от пользователя"""
+
+    def __init__(self, maxsize: int = 256, ttl_seconds: int = PAGE_TTL_SECONDS):
+        super().__init__(maxsize)
+        self.ttl_seconds = ttl_seconds
+
+    def store(self, key: tuple, response: Response) -> CachedPage:
+        body = bytes(response.body)
+        page = CachedPage(
+            body=body,
+            gzipped=gzip.compress(body, compresslevel=9) if len(body) >= GZIP_MIN_SIZE else None,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            media_type=response.media_type,
+            status_code=response.status_code,
+        )
+        self.put(key, page, time.time() + self.ttl_seconds)
+        return page
+
+    def respond(self, request: Request, page: CachedPage) -> Response:
+        headers = {"ETag": page.etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding, Accept-Language, Cookie"}
+        if etag_matches(request, page.etag):
+            return Response(status_code=304, headers=headers)
+
+        if page.gzipped is not None and accepts_gzip(request):
+            headers["Content-Encoding"] = "gzip"
+            return Response(page.gzipped, page.status_code, headers, page.media_type)
+        return Response(page.body, page.status_code, headers, page.media_type)
+
+
+page_cache = PageCache()
+
+
+def cached_page(route: Callable[[Request], Response]) -> Callable[[Request], Response]:
+    """Кэширует отрисованную страницу маршрута, у которого единственный параметр - request"""
+
+    @wraps(route)
+    def wrapper(request: Request) -> Response:
+        key = page_key(request)
+        page = page_cache.get(key)
+        if page is None:
+            page = page_cache.store(key, route(request))
+        return page_cache.respond(request, page)
+
+    return wrapper
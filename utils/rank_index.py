@@ -0,0 +1,209 @@
+from bisect import bisect_left, insort
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Connection, Engine, event, select
+from sqlalchemy.orm import Session, attributes
+
+from models import User, GamificationRecord
+from utils.catalog_cache import catalog_cache
+
+
+class RankIndex:
+    """Места лидерборда в памяти: дерево Фенвика по очкам и id пользователей
+    с равными очками в отсортированных списках.
+
+    Записей выше (points, user_id) = записей с большими очками (префиксная
+    сумма дерева, O(log P)) + пользователей с теми же очками и меньшим id
+    (бинарный поиск по списку). Учитываются только записи существующих
+    пользователей, как в get_page.
+    """
+
+    def __init__(self, rows: list[tuple[int, int]], version: int):
+        self.version = version
+        self.user_ids: dict[int, list[int]] = {}
+        for points, user_id in rows:
+            self.user_ids.setdefault(points, []).append(user_id)
+        for user_ids in self.user_ids.values():
+            user_ids.sort()
+        self._build()
+
+    def __len__(self) -> int:
+        return self.total
+
+    def _build(self) -> None:
+        """Дерево с запасом в обе стороны от текущих очков, за O(P)"""
+        low = min(self.user_ids, default=0)
+        high = max(self.user_ids, default=0)
+        margin = max(64, (high - low) // 2)
+        self.offset = low - margin
+        self.size = high - low + 2 * margin + 1
+        self.total = 0
+
+        tree = [0] * (self.size + 1)
+        for points, user_ids in self.user_ids.items():
+            tree[points - self.offset + 1] += len(user_ids)
+            self.total += len(user_ids)
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                tree[parent] += tree[i]
+        self.tree = tree
+
+    def _update(self, points: int, delta: int) -> None:
+        i = points - self.offset + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+        self.total += delta
+
+    def _not_above(self, points: int) -> int:
+        """Записей с очками <= points"""
+        i = min(points - self.offset + 1, self.size)
+        count = 0
+        while i > 0:
+            count += self.tree[i]
+            i -= i & -i
+        return count
+
+    def add(self, points: int, user_id: int) -> None:
+        insort(self.user_ids.setdefault(points, []), user_id)
+        if self.offset <= points < self.offset + self.size:
+            self._update(points, 1)
+        else:
+            # Очки вышли за границы дерева: перестраиваем с новым запасом
+            self._build()
+
+    def remove(self, points: int, user_id: int) -> bool:
+        """False - такой записи в индексе нет, он разошёлся с базой"""
+        user_ids = self.user_ids.get(points, [])
+        i = bisect_left(user_ids, user_id)
+        if i == len(user_ids) or user_ids[i] != user_id:
+            return False
+        del user_ids[i]
+        if not user_ids:
+            del self.user_ids[points]
+        self._update(points, -1)
+        return True
+
+    def count_ahead(self, points: int, user_id: int) -> int:
+        if points < self.offset:
+            above = self.total
+        else:
+            above = self.total - self._not_above(points)
+        return above + bisect_left(self.user_ids.get(points, []), user_id)
+
+
+class RankIndexCache:
+    """RankIndex на каждую базу (Engine) процесса.
+
+    Версия - строка game_records в catalog_versions, которую увеличивает
+    любое изменение очков или владельца записи (события в models). Свои
+    изменения процесс применяет к индексу сразу из тех же событий, чужие
+    видит по версии и один раз перечитывает индекс целиком.
+    """
+
+    def __init__(self):
+        self.loads = 0
+        self.applied = 0
+        self._indexes: WeakKeyDictionary[Engine, RankIndex] = WeakKeyDictionary()
+        self._lock = Lock()
+
+    def get(self, db: Session) -> RankIndex:
+        engine = db.get_bind().engine
+        version = catalog_cache.version(db, GamificationRecord.__tablename__)
+        index = self._indexes.get(engine)
+        if index is not None and index.version == version:
+            return index
+
+        # Версия и записи читаются в одной транзакции, поэтому согласованы
+        rows = db.execute(
+            select(GamificationRecord.points, GamificationRecord.user_id)
+                .join(User, User.id == GamificationRecord.user_id)
+        ).all()
+        index = RankIndex([(points or 0, user_id) for points, user_id in rows], version)
+        with self._lock:
+            self.loads += 1
+            current = self._indexes.get(engine)
+            if current is None or current.version < version:
+                self._indexes[engine] = index
+        return index
+
+    def apply(self, connection: Connection, old: tuple | None, new: tuple | None) -> None:
+        """Изменение записи (points, user_id) из события flush, после увеличения версии"""
+        with self._lock:
+            index = self._indexes.get(connection.engine)
+            if index is None:
+                return
+            version = catalog_cache.version(connection, GamificationRecord.__tablename__) # type: ignore
+            # Версия ушла дальше чем на это изменение - были чужие, индекс перечитается
+            if index.version != version - 1 or (old is not None and not index.remove(*old)):
+                del self._indexes[connection.engine]
+                return
+            if new is not None:
+                index.add(*new)
+            index.version = version
+            self.applied += 1
+        # Изменение ещё не закоммичено: при откате индекс надо перечитать
+        connection.info["rank_index_applied"] = True
+
+    def discard(self, engine: Engine) -> None:
+        with self._lock:
+            self._indexes.pop(engine, None)
+
+    def stats(self) -> dict:
+        return {
+            "indexes": [{"version": index.version, "records": len(index)} for index in self._indexes.values()],
+            "loads": self.loads,
+            "applied": self.applied,
+        }
+
+
+rank_index = RankIndexCache()
+
+
+def ranked(connection: Connection, points: int | None, user_id: int | None, user_changed: bool) -> tuple | None:
+    """(points, user_id), если запись входит в лидерборд: у неё есть существующий пользователь"""
+    if user_id is None:
+        return None
+    if user_changed and connection.scalar(select(User.id).where(User.id == user_id)) is None:
+        return None
+    return (points or 0, user_id)
+
+
+def previous(target: GamificationRecord, key: str):
+    history = attributes.get_history(target, key)
+    return history.deleted[0] if history.deleted else getattr(target, key)
+
+
+@event.listens_for(Engine, "commit")
+def _rank_commit(connection: Connection):
+    connection.info.pop("rank_index_applied", None)
+
+
+@event.listens_for(Engine, "rollback")
+def _rank_rollback(connection: Connection):
+    if connection.info.pop("rank_index_applied", None):
+        rank_index.discard(connection.engine)
+
+
+@event.listens_for(GamificationRecord, "after_insert")
+def _rank_insert(mapper, connection, target: GamificationRecord):
+    rank_index.apply(connection, None, ranked(connection, target.points, target.user_id, True)) # type: ignore
+
+
+@event.listens_for(GamificationRecord, "after_update")
+def _rank_update(mapper, connection, target: GamificationRecord):
+    if not any(attributes.get_history(target, key).has_changes() for key in ("points", "user_id")):
+        return
+    user_changed = attributes.get_history(target, "user_id").has_changes()
+    # Прежняя запись была в индексе, только если её пользователь существовал - это проверит remove
+    old_user_id = previous(target, "user_id")
+    old = (previous(target, "points") or 0, old_user_id) if old_user_id is not None else None
+    rank_index.apply(connection, old, ranked(connection, target.points, target.user_id, user_changed)) # type: ignore
+
+
+@event.listens_for(GamificationRecord, "after_delete")
+def _rank_delete(mapper, connection, target: GamificationRecord):
+    old = (target.points or 0, target.user_id) if target.user_id is not None else None
+    rank_index.apply(connection, old, None)
@@ -0,0 +1,68 @@
+import numpy as np
+
+from models import Course
+from utils.catalog_cache import CatalogEntry
+
+
+# Оси профиля навыков в порядке колонок матрицы
+SKILLS = (Course.creative_weight, Course.analytical_weight)
+OTHER_COURSES = 3
+
+
+class CourseRecommender:
+    """Профили всех курсов одной матрицей (курсы x навыки).
+
+    Курс тем ближе к результату теста, чем меньше евклидово расстояние
+    между его профилем и вектором баллов.
+    """
+
+    def __init__(self, rows: list[tuple], version: int):
+        self.version = version
+        self.course_ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.profiles = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(SKILLS))
+        self.norms = (self.profiles * self.profiles).sum(axis=1)
+
+    def __len__(self) -> int:
+        return len(self.course_ids)
+
+    def distances(self, scores: np.ndarray) -> np.ndarray:
+        """Квадраты расстояний, scores - (пользователи x навыки) -> (пользователи x курсы)"""
+        # |s - p|^2 = |s|^2 - 2 s.p + |p|^2: одно матричное умножение на весь батч
+        return (scores * scores).sum(axis=1)[:, None] - 2 * scores @ self.profiles.T + self.norms[None, :]
+
+    def top_k(self, scores: np.ndarray, k: int) -> np.ndarray:
+        """id k ближайших курсов для каждой строки scores, от лучшего к худшему"""
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty((len(scores), 0), dtype=np.int64)
+
+        distances = self.distances(scores)
+        # argpartition отбирает k лучших за O(n), сортируем только их
+        candidates = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+        candidate_ids = self.course_ids[candidates]
+        # При равном расстоянии выше курс с меньшим id
+        order = np.lexsort((candidate_ids, candidate_distances), axis=1)
+        return np.take_along_axis(candidate_ids, order, axis=1)
+
+    def recommend(self, *scores: float, others: int = OTHER_COURSES) -> tuple[int | None, list[int]]:
+        """(рекомендованный курс, другие подходящие курсы) для одного результата теста"""
+        ids = self.top_k(np.array([scores], dtype=np.float64), others + 1)[0].tolist()
+        return (ids[0] if ids else None), ids[1:]
+
+
+class CourseRecommenderCache:
+    """CourseRecommender для текущей версии каталога курсов"""
+
+    def __init__(self):
+        self._recommender: CourseRecommender | None = None
+
+    def get(self, courses: CatalogEntry) -> CourseRecommender:
+        recommender = self._recommender
+        if recommender is None or recommender.version != courses.version:
+            rows = [(course.id, *(getattr(course, skill.key) for skill in SKILLS)) for course in courses.items]
+            recommender = self._recommender = CourseRecommender(rows, courses.version)
+        return recommender
+
+
+course_recommender = CourseRecommenderCache()
@@ -0,0 +1,91 @@
+from array import array
+from threading import Lock
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import TestAnswer
+from utils.catalog_cache import catalog_cache
+
+
+class InvalidAnswer(ValueError):
+    pass
+
+
+class ScoringIndex:
+    """Баллы ответов теста в плоских массивах, индекс массива - id ответа.
+
+    question_ids[id] == 0 значит, что такого ответа нет.
+    """
+
+    def __init__(self, rows: list[tuple[int, int, int, int]], version: int):
+        size = max((row[0] for row in rows), default=0) + 1
+        self.version = version
+        self.question_ids = array("i", bytes(4 * size))
+        self.creative = array("i", bytes(4 * size))
+        self.analytical = array("i", bytes(4 * size))
+
+        for answer_id, question_id, creative, analytical in rows:
+            self.question_ids[answer_id] = question_id or 0
+            self.creative[answer_id] = creative or 0
+            self.analytical[answer_id] = analytical or 0
+
+    def score(self, answers: list[tuple[int, int]]) -> tuple[int, int]:
+        """Сумма (creative, analytical) по парам (question_id, answer_id)"""
+        creative_total = 0
+        analytical_total = 0
+
+        for question_id, answer_id in answers:
+            if not 0 < answer_id < len(self.question_ids) or self.question_ids[answer_id] == 0:
+                raise InvalidAnswer(f"Answer {answer_id} not found")
+            if self.question_ids[answer_id] != question_id:
+                raise InvalidAnswer(f"Answer {answer_id} does not belong to question {question_id}")
+
+            creative_total += self.creative[answer_id]
+            analytical_total += self.analytical[answer_id]
+
+        return creative_total, analytical_total
+
+
+class ScoringIndexCache:
+    """Держит ScoringIndex процесса для текущей версии ответов теста.
+
+    Версия - строка test_answers в catalog_versions: CRUD вопросов и ответов
+    увеличивает её через catalog_cache.touch в своей транзакции, и индекс
+    перестраивается во всех воркерах, а не только в обработавшем запрос.
+    """
+
+    def __init__(self):
+        self.loads = 0
+        self._index: ScoringIndex | None = None
+        self._lock = Lock()
+
+    def get(self, db: Session) -> ScoringIndex:
+        version = catalog_cache.version(db, TestAnswer.__tablename__)
+        index = self._index
+        if index is not None and index.version == version:
+            return index
+        return self.load(db, version)
+
+    def load(self, db: Session, version: int) -> ScoringIndex:
+        # Версия и ответы читаются в одной транзакции, поэтому согласованы
+        rows = db.execute(select(
+            TestAnswer.id,
+            TestAnswer.question_id,
+            TestAnswer.creative_value,
+            TestAnswer.analytical_value
+        )).all()
+        index = ScoringIndex([tuple(row) for row in rows], version) # type: ignore
+
+        with self._lock:
+            self.loads += 1
+            # Параллельный запрос мог уже загрузить более новую версию
+            if self._index is None or self._index.version < version:
+                self._index = index
+        return index
+
+    def stats(self) -> dict:
+        return {"version": self._index.version if self._index else None, "loads": self.loads}
+
+
+scoring_index = ScoringIndexCache()
@@ -0,0 +1,195 @@
+import asyncio
+import math
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from threading import Lock
+from typing import NamedTuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from database import session_local
+from models import (
+    TestSubmission,
+    TestSubmissionAnswer,
+    TestAnswerPicks,
+    TestScoreHistogram
+)
+
+
+BATCH_SIZE = 100
+MAX_DELAY_SECONDS = 5
+AXES = ("creative", "analytical")
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class PendingSubmission(NamedTuple):
+    creative: int
+    analytical: int
+    answers: list[tuple[int, int]]
+    date: datetime
+
+
+def write_batch(db: Session, batch: list[PendingSubmission]) -> None:
+    """Пишет пачку отправок и в той же транзакции прибавляет её к агрегатам"""
+    db.add_all([
+        TestSubmission(
+            creative_score=submission.creative,
+            analytical_score=submission.analytical,
+            date=submission.date,
+            answers=[
+                TestSubmissionAnswer(question_id=question_id, answer_id=answer_id)
+                for question_id, answer_id in submission.answers
+            ]
+        )
+        for submission in batch
+    ])
+
+    # Сначала сворачиваем пачку в счётчики, в базу - по одному UPSERT на строку агрегата
+    picks = Counter(answer_id for submission in batch for _, answer_id in submission.answers)
+    histogram = Counter(
+        (axis, score)
+        for submission in batch
+        for axis, score in zip(AXES, (submission.creative, submission.analytical))
+    )
+
+    if picks:
+        stmt = insert(TestAnswerPicks)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["answer_id"],
+                set_={"picks": TestAnswerPicks.picks + stmt.excluded.picks}
+            ),
+            [{"answer_id": answer_id, "picks": count} for answer_id, count in picks.items()]
+        )
+
+    stmt = insert(TestScoreHistogram)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["axis", "score"],
+            set_={"count": TestScoreHistogram.count + stmt.excluded.count}
+        ),
+        [{"axis": axis, "score": score, "count": count} for (axis, score), count in histogram.items()]
+    )
+    db.commit()
+
+
+class SubmissionWriter:
+    """Копит отправки теста в памяти и пишет их пачками"""
+
+    def __init__(self, batch_size: int = BATCH_SIZE, max_delay: float = MAX_DELAY_SECONDS):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._pending: list[PendingSubmission] = []
+        self._first_added: float | None = None
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, creative: int, analytical: int, answers: list[tuple[int, int]]) -> bool:
+        """Ставит отправку в очередь. True - пачка набралась или ждёт слишком долго, пора flush"""
+        with self._lock:
+            self._pending.append(PendingSubmission(creative, analytical, answers, datetime.now(timezone.utc)))
+            if self._first_added is None:
+                self._first_added = time.monotonic()
+            return len(self._pending) >= self.batch_size or \
+                time.monotonic() - self._first_added >= self.max_delay
+
+    def due(self) -> bool:
+        """Первая отправка в очереди ждёт дольше max_delay"""
+        with self._lock:
+            return self._first_added is not None and time.monotonic() - self._first_added >= self.max_delay
+
+    def flush(self, db: Session) -> int:
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._first_added = None
+        if not batch:
+            return 0
+
+        try:
+            write_batch(db, batch)
+        except Exception:
+            db.rollback()
+            # Не теряем отправки: вернём их в начало очереди до следующего flush
+            with self._lock:
+                self._pending[:0] = batch
+                self._first_added = self._first_added or time.monotonic()
+            raise
+        return len(batch)
+
+    def try_flush(self, db: Session) -> int:
+        """flush для запросов и фоновой задачи: ошибка записи только логируется,
+        отправки уже вернулись в очередь и уйдут следующим flush"""
+        try:
+            return self.flush(db)
+        except Exception as exc:
+            print(f"Test submissions: flush of {len(self)} failed: {exc!r}")
+            return 0
+
+    async def flush_periodically(self) -> None:
+        """Фоновая задача lifespan: add() проверяет max_delay только при новой
+        отправке, без неё последняя неполная пачка ждала бы до остановки"""
+        def flush() -> None:
+            with session_local() as db:
+                self.try_flush(db)
+
+        while True:
+            await asyncio.sleep(self.max_delay)
+            if self.due():
+                await run_in_threadpool(flush)
+
+
+def histogram_quantiles(histogram: dict[int, int], quantiles: tuple[float, ...] = QUANTILES) -> dict[float, int | None]:
+    """Квантили (nearest rank) по гистограмме целых баллов.
+
+    Баллы теста - небольшие целые, поэтому гистограмма даёт точные квантили
+    за проход по различным баллам, а не по всем отправкам.
+    """
+    total = sum(histogram.values())
+    result: dict[float, int | None] = {}
+    for quantile in quantiles:
+        if not total:
+            result[quantile] = None
+            continue
+
+        rank = max(1, math.ceil(quantile * total))
+        seen = 0
+        for score in sorted(histogram):
+            seen += histogram[score]
+            if seen >= rank:
+                result[quantile] = score
+                break
+    return result
+
+
+def load_stats(db: Session) -> dict:
+    """Аналитика отправок только из таблиц агрегатов, без чтения test_submissions"""
+    histograms: dict[str, dict[int, int]] = {axis: {} for axis in AXES}
+    for axis, score, count in db.execute(select(TestScoreHistogram.axis, TestScoreHistogram.score, TestScoreHistogram.count)):
+        histograms.setdefault(axis, {})[score] = count
+
+    # Каждая отправка попадает ровно в один столбец гистограммы каждой оси
+    total = sum(histograms[AXES[0]].values())
+    picks = dict(db.execute(select(TestAnswerPicks.answer_id, TestAnswerPicks.picks)).all())
+
+    return {
+        "total": total,
+        "picks": picks,
+        "axes": {
+            axis: {
+                "histogram": sorted(histogram.items()),
+                "max_count": max(histogram.values(), default=0),
+                "mean": sum(score * count for score, count in histogram.items()) / total if total else None,
+                "quantiles": histogram_quantiles(histogram),
+            }
+            for axis, histogram in histograms.items()
+        },
+    }
+
+
+submission_writer = SubmissionWriter()
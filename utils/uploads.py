@@ -0,0 +1,72 @@
+import hashlib
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import BinaryIO
+
+from fastapi import HTTPException
+
+
+CHUNK_SIZE = 64 * 1024
+# Начало файла -> расширение. GIF не принимаем
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+)
+
+
+def sniff_image(head: bytes) -> str | None:
+    """Расширение по сигнатуре файла, а не по content_type от клиента"""
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def store_image(source: BinaryIO, directory: Path, max_size: int) -> Path:
+    """Копирует картинку в directory кусками по CHUNK_SIZE под именем <sha256>.<расширение>.
+
+    Блокирующая: вызывать через run_in_threadpool. Хэш считается по ходу
+    копирования, во временный файл рядом с целевым, который потом
+    переименовывается: недописанных файлов в каталоге не бывает, а такая же
+    картинка, загруженная повторно, не создаёт второй файл.
+    Слишком большой файл дальше лимита не читается.
+    """
+    head = source.read(CHUNK_SIZE)
+    extension = sniff_image(head)
+    if extension is None:
+        raise HTTPException(status_code=400, detail="File must be an image")
+
+    directory.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    with NamedTemporaryFile(dir=directory, prefix=".upload-", delete=False) as tmp:
+        try:
+            size = 0
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(status_code=400, detail="File too large")
+                digest.update(chunk)
+                tmp.write(chunk)
+                chunk = source.read(CHUNK_SIZE)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+
+    target = directory / f"{digest.hexdigest()}.{extension}"
+    try:
+        if target.exists():
+            os.unlink(tmp.name)
+            # Свежая дата защищает общий файл от сборки мусора, пока Avatar не записан
+            os.utime(target)
+        else:
+            os.replace(tmp.name, target)
+    except OSError:
+        if os.path.exists(tmp.name):
+            os.unlink(tmp.name)
+        raise
+    return target
@@ -0,0 +1,159 @@
+import math
+from typing import Literal
+
+from sqlalchemy import Select, func, or_, select
+from sqlalchemy.orm import Session
+
+from models import (
+    User,
+    UserProfile,
+    GamificationRecord,
+    StudentCourse,
+    StudentTopics,
+    Achievement,
+    Title
+)
+from static import Roles
+from utils.catalog_cache import catalog_cache
+
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+Sort = Literal["id", "login", "nickname", "email", "level", "points", "courses", "topics", "achievements"]
+
+COLUMN_SORTS = {
+    "id": User.id,
+    "login": User.login,
+    "nickname": User.nickname,
+    "email": User.email,
+    "level": GamificationRecord.lvl,
+    "points": GamificationRecord.points,
+}
+
+# Счётчики связей: user_id -> count одним GROUP BY, без загрузки самих связей
+COUNTS = {
+    "courses": lambda: select(StudentCourse.student_id.label("user_id"), func.count().label("count"))
+        .group_by(StudentCourse.student_id),
+    "topics": lambda: select(StudentTopics.student_id.label("user_id"), func.count().label("count"))
+        .group_by(StudentTopics.student_id),
+    "achievements": lambda: select(UserProfile.user_id.label("user_id"), func.count(Achievement.id).label("count"))
+        .join(Achievement, Achievement.user_id == UserProfile.id)
+        .group_by(UserProfile.user_id),
+}
+
+
+def page_counts(db: Session, user_ids: list[int]) -> dict[str, dict[int, int]]:
+    """Счётчики только для пользователей страницы"""
+    counts = {}
+    for name, query in COUNTS.items():
+        stmt = query()
+        counts[name] = dict(db.execute(stmt.where(stmt.selected_columns.user_id.in_(user_ids))).all())
+    return counts
+
+
+def filtered(query: Select, q: str | None, role: Roles | None, title_id: int | None) -> Select:
+    if q:
+        query = query.where(or_(
+            User.login.contains(q, autoescape=True),
+            User.nickname.contains(q, autoescape=True),
+            User.email.contains(q, autoescape=True)
+        ))
+    if role is not None:
+        query = query.where(User.role == role)
+    if title_id is not None:
+        query = query.where(UserProfile.current_title_id == title_id)
+    return query
+
+
+def get_page(
+    db: Session,
+    q: str | None = None,
+    role: Roles | None = None,
+    title_id: int | None = None,
+    sort: Sort = "id",
+    descending: bool = False,
+    page: int = 1,
+    page_size: int = PAGE_SIZE
+) -> dict:
+    """Страница таблицы пользователей админки.
+
+    Поиск, фильтры, сортировка и LIMIT выполняются в SQL. Счётчики курсов,
+    тем и ачивок считаются GROUP BY: для сортировки по ним - по всем
+    пользователям, иначе только для строк страницы.
+    """
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    page = max(1, page)
+
+    query = select(
+        User.id,
+        User.login,
+        User.nickname,
+        User.email,
+        User.role,
+        UserProfile.id.label("profile_id"),
+        UserProfile.current_title_id,
+        GamificationRecord.lvl,
+        GamificationRecord.points
+    )\
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)\
+        .outerjoin(GamificationRecord, GamificationRecord.user_id == User.id)
+    query = filtered(query, q, role, title_id)
+
+    # Профиль нужен подсчёту только для фильтра по титулу
+    count_query = select(func.count(User.id))
+    if title_id is not None:
+        count_query = count_query.outerjoin(UserProfile, UserProfile.user_id == User.id)
+    total = db.scalar(filtered(count_query, q, role, title_id)) or 0
+
+    if sort in COUNTS:
+        counted = COUNTS[sort]().subquery()
+        query = query.outerjoin(counted, counted.c.user_id == User.id)
+        column = func.coalesce(counted.c.count, 0)
+    else:
+        column = COLUMN_SORTS[sort]
+    rows = db.execute(
+        query.order_by(column.desc() if descending else column.asc(), User.id)
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+    ).all()
+
+    user_ids = [row.id for row in rows]
+    counts = page_counts(db, user_ids) if user_ids else {name: {} for name in COUNTS}
+
+    achievements: dict[int, list[dict]] = {}
+    if profile_ids := [row.profile_id for row in rows if row.profile_id is not None]:
+        for id, name, profile_id in db.execute(
+            select(Achievement.id, Achievement.name, Achievement.user_id)
+                .where(Achievement.user_id.in_(profile_ids))
+                .order_by(Achievement.id)
+        ):
+            achievements.setdefault(profile_id, []).append({"id": id, "name": name})
+
+    titles = {title.id: title for title in catalog_cache.get(db, Title)} if any(row.current_title_id for row in rows) else {}
+
+    items = [
+        {
+            "id": row.id,
+            "login": row.login,
+            "nickname": row.nickname,
+            "email": row.email,
+            "role": row.role.value if row.role else None,
+            "title": titles.get(row.current_title_id),
+            "lvl": row.lvl or 0,
+            "points": row.points or 0,
+            "courses": counts["courses"].get(row.id, 0),
+            "topics": counts["topics"].get(row.id, 0),
+            "achievements_count": counts["achievements"].get(row.id, 0),
+            "achievements": achievements.get(row.profile_id, [])
+        }
+        for row in rows
+    ]
+
+    return {
+        "items": items,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "pages": max(1, math.ceil(total / page_size))
+    }
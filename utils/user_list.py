@@ -0,0 +1,59 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import User, UserProfile, GamificationRecord, Title, Avatar
+from utils.catalog_cache import catalog_cache
+
+
+USERS_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+
+def get_page(db: Session, after_id: int | None = None, limit: int = USERS_PAGE_SIZE) -> dict:
+    """Страница списка пользователей по ключу id последнего пользователя предыдущей страницы, без OFFSET.
+
+    Читаются только колонки карточки. Титулы и аватары - справочники,
+    поэтому берутся из catalog_cache по id, а не join-ом.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    query = select(
+        User.id,
+        User.login,
+        User.nickname,
+        User.role,
+        GamificationRecord.lvl,
+        GamificationRecord.points,
+        UserProfile.current_title_id,
+        UserProfile.current_avatar_id
+    )\
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)\
+        .outerjoin(GamificationRecord, GamificationRecord.user_id == User.id)
+    if after_id is not None:
+        query = query.where(User.id > after_id)
+
+    rows = db.execute(query.order_by(User.id).limit(limit + 1)).all()
+
+    titles = {title.id: title for title in catalog_cache.get(db, Title)} if any(row.current_title_id for row in rows) else {}
+    avatars = {avatar.id: avatar for avatar in catalog_cache.get(db, Avatar)} if any(row.current_avatar_id for row in rows) else {}
+
+    items = []
+    for row in rows[:limit]:
+        title = titles.get(row.current_title_id)
+        avatar = avatars.get(row.current_avatar_id)
+        items.append({
+            "id": row.id,
+            "login": row.login,
+            "nickname": row.nickname,
+            "role": row.role.value if row.role else None,
+            "lvl": row.lvl or 0,
+            "points": row.points or 0,
+            "title": title.name if title else None,
+            "avatar": {"url": avatar.url, "variants": avatar.variants} if avatar else None
+        })
+
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = {"after_id": items[-1]["id"]}
+
+    return {"items": items, "next": next_cursor}
@@ -2,14 +2,17 @@ from utils.helpers import TOKEN_TYPE_FIELD, ACCESS_TOKEN_TYPE, REFRESH_TOKEN_TYP
 from fastapi import HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt import InvalidTokenError
+from sqlalchemy import select
 from sqlalchemy.orm import Session, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 from auth import utils_jwt
-from schemas.users import User as UserSchema
-from models import User
+from auth.principal_cache import principal_cache
+from schemas.users import User as UserSchema, Principal
+from models import User, StudentCourse, StudentTopics
 from utils.db_helpher import get_db
-from routers.users import get_users
+from routers.users import get_users_with, USER_LOAD_PROFILES
 
 oath2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login/",)
 
@@ -56,7 +59,7 @@ def get_user_by_token_sub(payload: dict, users: Query) -> UserSchema:
 def get_auth_user_from_token_of_type(token_type: str):
     def get_auth_user_from_token(
         payload: dict = Depends(get_current_token_payload),
-        users: Query = Depends(get_users)
+        users: Query = Depends(get_users_with("principal"))
     ) -> UserSchema:
         validate_token_type(payload,token_type)
         return get_user_by_token_sub(payload, users)
@@ -66,3 +69,55 @@ def get_auth_user_from_token_of_type(token_type: str):
 
 get_current_auth_user = get_auth_user_from_token_of_type(ACCESS_TOKEN_TYPE)
 get_current_auth_user_for_refresh = get_auth_user_from_token_of_type(REFRESH_TOKEN_TYPE)
+
+
+def load_principal(db: Session, payload: dict) -> Principal:
+    """Читает Principal из базы и кладёт его в кэш до exp токена"""
+    sub: str = payload.get("sub") # type: ignore
+    generation = principal_cache.generation
+
+    user = db.query(User).options(*USER_LOAD_PROFILES["principal"]).filter(User.id == int(sub)).first()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
+                            detail="Invalid username or password")
+
+    course_ids = db.scalars(select(StudentCourse.course_id).where(StudentCourse.student_id == user.id))
+    topic_ids = db.scalars(select(StudentTopics.topic_id).where(StudentTopics.student_id == user.id))
+
+    principal = Principal(
+        id=user.id,
+        login=user.login,
+        nickname=user.nickname,
+        role=user.role,
+        course_ids=frozenset(course_ids),
+        completed_topic_ids=frozenset(topic_ids)
+    )
+    principal_cache.put(sub, principal, payload.get("exp"), generation)
+    return principal
+
+
+def get_principal_from_token_of_type(token_type: str):
+    def get_principal_from_token(
+        payload: dict = Depends(get_current_token_payload),
+        db: Session = Depends(get_db)
+    ) -> Principal:
+        validate_token_type(payload, token_type)
+        if principal := principal_cache.get(payload.get("sub")): # type: ignore
+            return principal
+        return load_principal(db, payload)
+    
+    return get_principal_from_token
+
+
+get_current_principal = get_principal_from_token_of_type(ACCESS_TOKEN_TYPE)
+get_current_principal_for_refresh = get_principal_from_token_of_type(REFRESH_TOKEN_TYPE)
+
+
+async def get_principal_by_token(token: str, db: AsyncSession) -> Principal:
+    """Principal по cookie access_token для async-роутов"""
+    payload = get_current_token_payload(token)
+    validate_token_type(payload, ACCESS_TOKEN_TYPE)
+
+    if principal := principal_cache.get(payload.get("sub")): # type: ignore
+        return principal
+    return await db.run_sync(load_principal, payload)
@@ -150,6 +150,8 @@ document.addEventListener('DOMContentLoaded', function() {
                 // Обновляем аватар на странице
                 const selectedAvatar = document.querySelector(`.avatar-option[data-avatar-id="${selectedAvatarId}"] img`);
                 if (selectedAvatar) {
+                    // Миниатюры старого аватара в <picture> перекрыли бы новый src
+                    userAvatar.closest('picture')?.querySelectorAll('source').forEach(source => source.remove());
                     userAvatar.src = selectedAvatar.src;
                 }
                 
@@ -1,17 +1,20 @@
 // templateLoader3.js - Исправленная версия
+// Шапка и подвал приходят в HTML страницы с сервера. Загрузка по сети -
+// только запасной путь для страниц, где остались заполнители
+async function loadPartial(name) {
+    const placeholder = document.getElementById(`${name}-placeholder`);
+    if (!placeholder) return;
+
+    const response = await fetch(`/partials/${name}`);
+    placeholder.outerHTML = await response.text();
+}
+
 async function loadTemplates() {
     try {
         console.log('Начало загрузки шаблонов...');
         
-        // Загрузка header
-        const headerResponse = await fetch('/static/templates/header.html');
-        const headerHTML = await headerResponse.text();
-        document.getElementById('header-placeholder').outerHTML = headerHTML;
-        
-        // Загрузка footer
-        const footerResponse = await fetch('/static/templates/footer.html');
-        const footerHTML = await footerResponse.text();
-        document.getElementById('footer-placeholder').outerHTML = footerHTML;
+        // Обе части параллельно, а не одна за другой
+        await Promise.all([loadPartial('header'), loadPartial('footer')]);
         
         console.log('Шаблоны загружены, инициализация скриптов...');
         